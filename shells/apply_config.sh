@@ -0,0 +1,30 @@
+#!/bin/sh
+# applies a batch of knob changes in one privileged invocation, one change per
+# line on stdin:
+#   core_status <cpu> <status>
+#   core_freq <system> <new_freq> <cur_freq>
+#   gpu_freq <system> <new_freq> <cur_freq>
+#   emc_freq <system> <new_freq>
+#   policy <scheduler>
+#   sysctl <key>=<value>
+dir=$(dirname "$0")
+status=0
+while read -r op a b c
+do
+    case $op in
+        core_status) sh "$dir/change_core_status.sh" "$a" "$b" ;;
+        core_freq) sh "$dir/change_core_frequency.sh" "$a" "$b" "$c" ;;
+        gpu_freq) sh "$dir/change_gpu_frequency.sh" "$a" "$b" "$c" ;;
+        emc_freq) sh "$dir/change_emc_frequency.sh" "$a" "$b" ;;
+        policy) echo "$a" > /sys/block/mmcblk0/queue/scheduler ;;
+        sysctl) sysctl -q -w "$a" ;;
+        "") continue ;;
+        *) echo "unknown knob $op"; false ;;
+    esac
+    if [ $? -ne 0 ]
+    then
+        echo "failed: $op $a $b $c"
+        status=1
+    fi
+done
+exit $status
@@ -0,0 +1,170 @@
+import numpy as np
+import pandas as pd
+
+class ActiveSampler(object):
+    """This class is used to choose the configurations to measure with a surrogate
+    model. A random forest is fitted on the configurations measured so far and the
+    next batch is the set of candidates the forest is most uncertain about, or
+    expects the largest improvement from, over all the objectives. Sampling stops
+    when the error of the forest on the newly measured batches stops improving.
+    """
+    def __init__(self, space, config_columns, objectives,
+                 batch_size=50, initial_size=100,
+                 acquisition="uncertainty", pool_size=5000,
+                 patience=3, tol=0.02, max_samples=1600,
+                 n_estimators=100, seed=None):
+        """
+        Parameters
+        ----------
+            space: ConfigSpace the candidates are drawn from
+            config_columns: columns of a configuration
+            objectives: measurement columns the surrogate predicts
+            acquisition: uncertainty or ei (expected improvement, minimization)
+            pool_size: candidates scored per batch
+            patience: batches without relative improvement larger than tol
+                      after which sampling stops
+        """
+        print("[STATUS]: Initializing ActiveSampler Class")
+        self.space = space
+        self.config_columns = list(config_columns)
+        self.objectives = list(objectives)
+        self.batch_size = batch_size
+        self.initial_size = initial_size
+        self.acquisition = acquisition
+        self.pool_size = pool_size
+        self.patience = patience
+        self.tol = tol
+        self.max_samples = max_samples
+        self.n_estimators = n_estimators
+        self.rng = np.random.default_rng(seed)
+        self.encoders = self.get_encoders()
+        self.models = None
+        self.errors = []
+
+    def get_encoders(self):
+        """This function is used to encode the columns of a configuration, numeric
+        columns are used as they are and the values of categorical columns, e.g. the
+        scheduler policy or the sqlite journal mode, are replaced by their index in
+        the domain of the column
+        Returns
+        -------
+            encoders: list with None for numeric columns and a dict mapping values
+                      to indices for categorical columns
+        """
+        encoders = []
+        for values in self.space.get_domains():
+            try:
+                [float(v) for v in values]
+                encoders.append(None)
+            except (TypeError, ValueError):
+                encoders.append({str(v): i for i, v in enumerate(values)})
+        return encoders
+
+    def get_features(self, configs):
+        df = pd.DataFrame([list(c) for c in configs], columns=self.config_columns)
+        X = np.empty(df.shape, dtype=np.float64)
+        for j, (col, encoder) in enumerate(zip(df.columns, self.encoders)):
+            if encoder is None:
+                X[:, j] = pd.to_numeric(df[col], errors="coerce").fillna(-1)
+            else:
+                # values outside the domain, e.g. from an older log, get -1
+                X[:, j] = [encoder.get(str(v), -1) for v in df[col]]
+        return X
+
+    def get_targets(self, df):
+        return df.groupby(self.config_columns, sort=False)[self.objectives].mean()
+
+    def fit(self, df):
+        """This function is used to fit one forest per objective on the measured
+        rows, repeated runs of a configuration are averaged"""
+        from sklearn.ensemble import RandomForestRegressor
+        targets = self.get_targets(df)
+        X = self.get_features(targets.index.tolist())
+        self.models = {}
+        for obj in self.objectives:
+            y = targets[obj].to_numpy(dtype=np.float64)
+            keep = ~np.isnan(y)
+            model = RandomForestRegressor(n_estimators=self.n_estimators,
+                                          random_state=int(self.rng.integers(2**31)),
+                                          n_jobs=-1)
+            model.fit(X[keep], y[keep])
+            self.models[obj] = (model, np.nanmin(y), np.nanstd(y) or 1.0)
+
+    def predict(self, X):
+        """This function is used to predict the objectives
+        Returns
+        -------
+            mean, std: dicts of the mean and spread of the tree predictions
+        """
+        mean, std = {}, {}
+        for obj, (model, _, _) in self.models.items():
+            trees = np.stack([tree.predict(X) for tree in model.estimators_])
+            mean[obj] = trees.mean(axis=0)
+            std[obj] = trees.std(axis=0)
+        return mean, std
+
+    def score(self, X):
+        """This function is used to score candidates, objectives are scaled by
+        their spread in the measured data and the scores are summed"""
+        from scipy.stats import norm
+        mean, std = self.predict(X)
+        score = np.zeros(len(X))
+        for obj, (_, best, scale) in self.models.items():
+            if self.acquisition == "ei":
+                s = np.maximum(std[obj], 1e-12)
+                z = (best - mean[obj]) / s
+                score += (s * (z * norm.cdf(z) + norm.pdf(z))) / scale
+            else:
+                score += std[obj] / scale
+        return score
+
+    def update(self, df, batch):
+        """This function is used to record the error of the surrogate on a newly
+        measured batch before it is refitted
+        Parameters
+        ----------
+            df: all the measured rows, including the batch
+            batch: rows of the new batch
+        """
+        if self.models is not None and len(batch):
+            targets = self.get_targets(batch)
+            mean, _ = self.predict(self.get_features(targets.index.tolist()))
+            error = 0.0
+            for obj, (_, _, scale) in self.models.items():
+                y = targets[obj].to_numpy(dtype=np.float64)
+                error += np.nanmean(np.abs(mean[obj] - y)) / scale
+            self.errors.append(error / len(self.models))
+            print("[STATUS]: surrogate error {0:.4f}".format(self.errors[-1]))
+        self.fit(df)
+
+    def done(self, num_measured):
+        """This function is used to check if the error plateaued"""
+        if num_measured >= self.max_samples:
+            return True
+        if len(self.errors) <= self.patience:
+            return False
+        best = min(self.errors[:-self.patience])
+        recent = min(self.errors[-self.patience:])
+        return recent > best * (1 - self.tol)
+
+    def next_batch(self, measured):
+        """This function is used to choose the next configurations
+        Parameters
+        ----------
+            measured: set of configuration tuples already measured
+        Returns
+        -------
+            configs: list of configuration tuples
+        """
+        seed = int(self.rng.integers(2**31))
+        if self.models is None:
+            # space filling start
+            configs = self.space.stream(self.initial_size + len(measured), "lhs", seed)
+            return [c for c in configs if c not in measured][:self.initial_size]
+        candidates = [c for c in self.space.stream(self.pool_size, "uniform", seed)
+                      if c not in measured]
+        if not candidates:
+            return []
+        score = self.score(self.get_features(candidates))
+        best = np.argsort(-score)[:self.batch_size]
+        return [candidates[i] for i in best]
@@ -1,9 +1,10 @@
 import sys
+import heapq
+import itertools
 import pandas as pd
 import pydot
 import traceback
 import numpy as np
-from cadet.Configurations import Config as cfg
 from collections import defaultdict
 from causalnex.structure.notears import from_pandas
 from causalnex.network import BayesianNetwork
@@ -14,8 +15,28 @@ from causalnex.structure.notears import from_pandas
 from causalnex.network import BayesianNetwork
 
 class CausalModel:
-    def __init__(self):
+    def __init__(self, notears_refit_every=10, fci_backend="tetrad", 
+                 fci_alpha=0.05, fci_jobs=1, path_effect_jobs=1,
+                 notears_refit_tol=0.05):
         print("initializing CausalModel class")      
+        if fci_backend not in ("tetrad", "native"):
+            raise ValueError("fci_backend must be 'tetrad' or 'native'")
+        self.fci_backend = fci_backend
+        self.fci_alpha = fci_alpha
+        self.fci_jobs = fci_jobs
+        # memoized pair effects for path ranking
+        from cadet.path_effect import PathEffect
+        self.path_effect = PathEffect(n_jobs=path_effect_jobs)
+        # incremental NOTEARS state
+        self.notears_refit_every = notears_refit_every
+        # warm starts with a weight this close to the threshold are refitted
+        self.notears_refit_tol = notears_refit_tol
+        self.notears = None
+        self.notears_updates = 0
+        self.notears_refit_rows = 0
+        self.notears_last_row = None
+        # absolute NOTEARS weights of the last learned structure
+        self.edge_weights = {}
 
     def get_tabu_edges(self, columns, options, 
                        objectives):
@@ -47,32 +68,143 @@ class CausalModel:
             print("Edges: {0}".format(edges))
     
     def learn_notears(self, df, tabu_edges, 
-                      thres):
+                      thres, incremental=False, 
+                      force_refit=False):
         """This function is used to learn model using NOTEARS"""
+        if incremental:
+            return self.learn_notears_incremental(df, tabu_edges, thres, 
+                                                  force_refit)
         sm = from_pandas(df, tabu_edges = tabu_edges, w_threshold=thres)
         return sm, sm.edges    
 
+    def get_edge_weights(self, sm):
+        """This function is used to get the absolute NOTEARS weight of every edge
+        Parameters
+        ----------
+            sm: StructureModel, or the weighted adjacency dataframe of the 
+                incremental NOTEARS
+        Returns
+        -------
+            weights: dict mapping (cause, effect) to the absolute weight
+        """
+        if isinstance(sm, pd.DataFrame):
+            return {(u, v): abs(float(w)) for u, row in sm.iterrows() 
+                    for v, w in row.items() if w != 0}
+        return {(u, v): abs(float(w)) 
+                for u, v, w in sm.edges(data="weight", default=1.0)}
+
+    def is_notears_refit(self, df, tabu_edges, 
+                         force_refit=False):
+        """This function is used to decide if the next incremental NOTEARS call is a
+        full refit, it is when force_refit is set, every notears_refit_every calls
+        and when df is not an extension of the previously seen data"""
+        X = df.to_numpy(dtype=np.float64)
+        nt = self.notears
+        appended = (nt is not None and nt.columns == list(df.columns) 
+                    and nt.tabu_edges == set(tuple(e) for e in tabu_edges)
+                    and len(X) >= nt.n and nt.n > 0
+                    and np.array_equal(X[nt.n - 1], self.notears_last_row))
+        return (force_refit or not appended 
+                or self.notears_updates >= self.notears_refit_every)
+
+    def get_notears_history(self, df, tabu_edges):
+        """This function is used to describe the updates the incremental NOTEARS
+        result of df depends on, the rows of the last full refit and the number of
+        warm starts since
+        Returns
+        -------
+            history: (refit_rows, updates)
+        """
+        if self.is_notears_refit(df, tabu_edges):
+            return len(df), 0
+        return self.notears_refit_rows, self.notears_updates + 1
+
+    def learn_notears_incremental(self, df, tabu_edges, 
+                                  thres, force_refit=False):
+        """This function is used to learn model using NOTEARS when rows are appended 
+        to df between calls. Only the new rows update the sufficient statistics and 
+        the solver is warm-started from the previous weights, see 
+        IncrementalNotears.update for when a warm start is replaced by a full fit.
+        A full refit is done every notears_refit_every calls, when force_refit is 
+        set or when df is not an extension of the previously seen data.
+        Returns
+        -------
+            W: weighted adjacency matrix as a dataframe
+            edges: list of (cause, effect) tuples
+        """
+        from cadet.notears import IncrementalNotears
+        columns = list(df.columns)
+        X = df.to_numpy(dtype=np.float64)
+        nt = self.notears
+        if self.is_notears_refit(df, tabu_edges, force_refit):
+            nt = IncrementalNotears(columns, tabu_edges)
+            nt.partial_fit(X)
+            nt.fit(warm_start=False)
+            self.notears_updates = 0
+            self.notears_refit_rows = len(X)
+        else:
+            nt.update(X[nt.n:], thres, self.notears_refit_tol)
+            self.notears_updates += 1
+        self.notears = nt
+        self.notears_last_row = X[-1].copy()
+        W = pd.DataFrame(nt.W, index=columns, columns=columns)
+        return W, nt.get_edges(thres)
+
     def learn_fci(self, df, tabu_edges):
-        """This function is used to learn model using FCI"""
-        from pycausal.pycausal import pycausal as pc
-        from pycausal import search as s
-        from pycausal import prior as p
-        pc=pc()
-        pc.start_vm()
-        forbid = [list(i) for i in tabu_edges]
-        prior = p.knowledge(forbiddirect = forbid)
-        tetrad=s.tetradrunner()
-        tetrad.getAlgorithmParameters(algoId = 'fci', testId = 'fisher-z-test')
-        tetrad.run(algoId = 'fci', dfs = df, testId = 'fisher-z-test', 
-                   depth = -1, maxPathLength = -1, completeRuleSetUsed = False, 
-                   verbose = False)
-        edges = tetrad.getEdges()
-        dot_str = pc.tetradGraphToDot(tetrad.getTetradGraph())
-        graph = pydot.graph_from_dot_data(dot_str)
-        # graph[0].write_pdf(fname) 
-        pc.stop_vm()
+        """This function is used to learn model using FCI. With the tetrad backend 
+        the JVM and the prior knowledge are kept alive across calls by FCIEngine, 
+        the native backend runs in process without a JVM and spreads the 
+        conditional independence tests of a depth over fci_jobs processes."""
+        if self.fci_backend == "native":
+            from cadet.fci import FCI
+            return FCI(alpha=self.fci_alpha, n_jobs=self.fci_jobs).fit(df, tabu_edges)
+        from cadet.fci_engine import FCIEngine
+        engine = FCIEngine.get_instance()
+        edges = engine.run(df, tabu_edges)
         return edges
 
+    def learn_structure(self, df, tabu_edges, 
+                        columns, thres=0.75, cache=None,
+                        incremental=False):
+        """This function is used to learn the mixed causal graph from NOTEARS and FCI,
+        a structure already in cache is reused without learning. With incremental 
+        NOTEARS is updated from the rows appended to df since the previous call. The
+        NOTEARS weights are kept in self.edge_weights, they are empty for a cached
+        structure
+        Returns
+        -------
+            G: mixed graph ADMG
+            di_edges: directed edges
+            bi_edges: bi-directed edges
+        """
+        key = None
+        if cache is not None:
+            params = {"fci_backend": self.fci_backend, "incremental": incremental}
+            if incremental:
+                # a warm-started result also depends on the earlier updates
+                params["notears_history"] = self.get_notears_history(df, tabu_edges)
+                params["notears_refit_tol"] = self.notears_refit_tol
+            key = cache.make_key(df, columns, tabu_edges, thres, **params)
+            cached = cache.get(key)
+            if cached is not None:
+                print("[STATUS]: reusing cached causal structure")
+                self.edge_weights = {}
+                di_edges, bi_edges = cached
+                G = ADMG(columns, di_edges = di_edges, bi_edges = bi_edges)
+                return G, di_edges, bi_edges
+        sm, notears_edges = self.learn_notears(df, tabu_edges, thres, 
+                                               incremental=incremental)
+        self.edge_weights = self.get_edge_weights(sm)
+        fci_edges = self.learn_fci(df, tabu_edges)
+        # resolve notears_edges and fci_edges 
+        di_edges, bi_edges = self.resolve_edges(notears_edges, fci_edges, columns, 
+                                                tabu_edges)
+        if cache is not None:
+            cache.put(key, di_edges, bi_edges)
+        # construct mixed graph ADMG
+        G = ADMG(columns, di_edges = di_edges, bi_edges = bi_edges)
+        return G, di_edges, bi_edges
+
     def resolve_edges(self, DAG, PAG, 
                       columns, tabu_edges):
         """This function is used to resolve no-tears (DAG) and fci (PAG) edges"""
@@ -122,101 +254,314 @@ class CausalModel:
         return single_edges, double_edges
     
     def get_causal_paths(self, columns, di_edges,
-                         bi_edges, objectives):
-        """This function is used to discover causal paths from an objective node"""
+                         bi_edges, objectives, 
+                         max_length=None, top_k=None, 
+                         weights=None):
+        """This function is used to discover causal paths from an objective node
+        Parameters
+        ----------
+            max_length: maximum number of edges of a path, longer paths are cut
+            top_k: keep only the k best paths by edge weight score
+            weights: dict mapping (cause, effect) to an edge weight, e.g. the 
+                     NOTEARS weights. Edges without a weight get 1.0
+        Returns
+        -------
+            causal_paths: dict mapping objectives to lists of paths
+        """
+        weights = weights or {}
         CG = Graph(columns)
         causal_paths={}
         for edge in di_edges:
-            CG.add_edge(edge[1], edge[0])
+            CG.add_edge(edge[1], edge[0], weights.get(tuple(edge), 1.0))
         for edge in bi_edges:
-            CG.add_edge(edge[1], edge[0])
+            CG.add_edge(edge[1], edge[0], weights.get(tuple(edge), 1.0))
         for obj in objectives:
-            CG.get_all_paths(obj)
-            causal_paths[obj] = CG.path
+            if top_k is not None:
+                causal_paths[obj] = CG.top_k_paths(obj, top_k, max_length)
+            else:
+                causal_paths[obj] = CG.get_all_paths(obj, max_length)
         
         return causal_paths 
     
     def compute_path_causal_effect(self, df, paths, 
                                    G, K):
-        """This function is used to compute P_ACE for each path"""
-        ace = {}
-        for path in paths:
-            ace[path] = 0
-            for i in range(0, len(path)):
-              if i > 0:
-                obj= CausalEffect(graph=G, treatment=path[i],outcome=path[0])
-                ace[path] += obj.compute_effect(df, "gformula") # computing the effect
-                print ("causal effect of {0} on {1}".format(path[i], path[0]))
-                print("ace = ", ace, "\n")
+        """This function is used to compute P_ACE for each path. Pair effects are 
+        memoized by PathEffect and shared between paths.
+        Returns
+        -------
+            paths: top K paths ranked by P_ACE
+        """
+        ace = self.path_effect.path_effects(df, G, paths)
+        print("ace = ", ace, "\n")
         # rank paths and select top K
-        paths = {k: v for k, v in sorted(ace.items(), key=lambda item: item[1], reverse = True)}[:K]
-        return paths 
+        ranked = sorted(ace.items(), key=lambda item: item[1], reverse = True)[:K]
+        return [list(path) for path, _ in ranked]
     
     def compute_individual_treatment_effect(self, df, paths, 
                                             G, query, objectives, 
-                                            bug_val, config):
-        """This function is used to compute individual treatment effect"""
-        from causality.estimation.nonparametric import CausalEffect
-        ite = {}
+                                            bug_val, config, domains, 
+                                            max_options=5):
+        """This function is used to compute individual treatment effect. All the 
+        candidate values of the intervenable options on the causal paths are scored 
+        in batch by TreatmentEffect, the ranked table is kept in self.ite and the 
+        best values are written into config.
+        Parameters
+        ----------
+            paths: dict mapping objectives to causal paths
+            bug_val: objective value of the bug, a dict for several objectives
+            config: bug configuration (dict or Series), updated in place
+            domains: dict mapping intervenable options to candidate values
+        Returns
+        -------
+            config: repaired configuration
+        """
+        from cadet.treatment_effect import TreatmentEffect
+        if isinstance(objectives, str):
+            objectives = [objectives]
+        if not isinstance(bug_val, dict):
+            bug_val = {obj: bug_val for obj in objectives}
+        tables = []
+        target = 0
+        for obj in objectives:
+            options = []
+            for path in paths.get(obj, []):
+                options.extend(p for p in path[1:] if p in domains and p not in options)
+            # the other options of the bug individualize the effects
+            table = TreatmentEffect(df, G, obj, list(domains)).rank(options, domains, 
+                                                                    config)
+            # relative change so that the effects on several objectives add up
+            scale = abs(bug_val[obj]) or 1.0
+            table["effect"] = table["effect"] / scale
+            tables.append(table)
+            if query == "best":
+                target += (np.min(df[obj]) - bug_val[obj]) / scale
+            else:
+                target -= query
+        ite = pd.concat(tables, ignore_index=True)
+        ite = ite.groupby(["option", "value"], as_index=False)["effect"].sum()
+        self.ite = ite.sort_values("effect", kind="mergesort").reset_index(drop=True)
+        # Find the best config options and values 
+        best = self.ite.drop_duplicates("option", keep="first")
+        change = 0
+        for _, row in best[best["effect"] < 0].head(max_options).iterrows():
+            config[row["option"]] = row["value"]
+            change += row["effect"]
+            if change <= target:
+                break
+        return config
+
+    def compute_pareto_recommendations(self, df, paths, 
+                                       G, query, objectives, 
+                                       bug_val, config, domains, 
+                                       max_options=3, num_candidates=2000, 
+                                       seed=0):
+        """This function is used to recommend a repair for several objectives at 
+        once. The effect of every candidate value of every option on the causal paths
+        of an objective is predicted in batch by TreatmentEffect, candidate 
+        interventions changing up to max_options options are scored by adding up 
+        their effects and ranked by pareto front. The ranked table is kept in 
+        self.pareto and the best repair on the first front is written into config.
+        Parameters
+        ----------
+            paths: dict mapping objectives to causal paths
+            bug_val: dict of the objective values of the bug
+            config: bug configuration (dict or Series), updated in place
+            domains: dict mapping intervenable options to candidate values
+            num_candidates: interventions changing several options that are scored
+        Returns
+        -------
+            config: repaired configuration
+        """
+        from cadet.treatment_effect import TreatmentEffect
+        from cadet.pareto import pareto_rank, crowding_distance
+        if isinstance(objectives, str):
+            objectives = [objectives]
+        if not isinstance(bug_val, dict):
+            bug_val = {obj: bug_val for obj in objectives}
+        options = []
+        for obj in objectives:
+            for path in paths.get(obj, []):
+                options.extend(p for p in path[1:] if p in domains and p not in options)
+        # candidate values of every option, the current value last
+        values = []
+        for opt in options[:]:
+            current = float(config[opt]) if opt in config else float(df[opt].mean())
+            domain = np.asarray(domains[opt], dtype=np.float64)
+            domain = domain[domain != current]
+            if len(domain):
+                values.append(np.append(domain, current))
+            else:
+                options.remove(opt)
+        if not options:
+            self.pareto = pd.DataFrame()
+            return config
+        # effect of every value of every option on every objective, options off 
+        # the causal paths of an objective do not change it
+        effects = {}
+        for obj in objectives:
+            te = TreatmentEffect(df, G, obj, list(domains))
+            on_path = set(p for path in paths.get(obj, []) for p in path[1:])
+            effects[obj] = []
+            for opt, vals in zip(options, values):
+                if opt in on_path:
+                    pred = te.predict(opt, vals, config)
+                    effects[obj].append(pred - pred[-1])
+                else:
+                    effects[obj].append(np.zeros(len(vals)))
+        # candidate interventions as value indices, len(values) - 1 keeps an option
+        keep = np.array([len(vals) - 1 for vals in values])
+        singles = []
+        for j, vals in enumerate(values):
+            for d in range(len(vals) - 1):
+                digits = keep.copy()
+                digits[j] = d
+                singles.append(digits)
+        rng = np.random.default_rng(seed)
+        multi = np.tile(keep, (num_candidates if len(options) > 1 else 0, 1))
+        for row in multi:
+            k = rng.integers(2, min(max_options, len(options)) + 1)
+            for j in rng.choice(len(options), k, replace=False):
+                row[j] = rng.integers(0, keep[j])
+        digits = np.unique(np.vstack([np.array(singles).reshape(-1, len(options)),
+                                      multi]), axis=0)
+        digits = digits[np.any(digits != keep, axis=1)]
+        # predicted objectives of all the candidates with one gather per option
+        Y = np.empty((len(digits), len(objectives)))
+        for k, obj in enumerate(objectives):
+            Y[:, k] = bug_val[obj]
+            for j in range(len(options)):
+                Y[:, k] += effects[obj][j][digits[:, j]]
+        scale = np.array([abs(bug_val[obj]) or 1.0 for obj in objectives])
+        rel = (Y - np.array([bug_val[obj] for obj in objectives])) / scale
         if query == "best":
-            bestval = np.min(df[objectives])
+            target = np.array([np.min(df[obj]) for obj in objectives])
         else:
-            bestval = (1-query)*bug_val
-        for path in paths:
-            for i in range(0, len(path)):
-               if i > 0:
-                   if cfg.is_intervenable[path[i]]:
-                       index = cfg.index[path[i]]
-                       effect = CausalEffect(G, path[i], path[0])
-                       max_effect = -20000
-                       for val in cfg.path[i]:
-                           x = df({path[i] : [val], path[0] : [bestval]})
-                           if max_effect < effect.pdf(x):
-                               max_effect = effect.pdf(x)
-                               ite[path[i]] = [max_effect, val, index]
-        # Find the best config options and values 
-        options = [v for _, v in sorted(ace.items(), key=lambda item: item[0], reverse = True)][:5]                
-        for opt in options:
-            config[opt[2]] = opt[1]
+            target = np.array([(1 - query) * bug_val[obj] for obj in objectives])
+        table = pd.DataFrame({"front": pareto_rank(Y),
+                              "feasible": np.all(Y < target, axis=1),
+                              "changes": (digits != keep).sum(axis=1),
+                              "total_change": rel.sum(axis=1)})
+        table["crowding"] = 0.0
+        for front in np.unique(table["front"]):
+            idx = np.flatnonzero(table["front"].to_numpy() == front)
+            table.loc[idx, "crowding"] = crowding_distance(Y[idx])
+        for k, obj in enumerate(objectives):
+            table["pred_" + obj] = Y[:, k]
+            table["change_" + obj] = rel[:, k]
+        for j, opt in enumerate(options):
+            table[opt] = values[j][digits[:, j]]
+        # first front first, repairs meeting the target on all the objectives, then
+        # the largest joint improvement with the fewest changes, remaining ties go
+        # to the least crowded repair of the front
+        table = table.sort_values(["front", "feasible", "total_change", "changes",
+                                   "crowding"],
+                                  ascending=[True, False, True, True, False], 
+                                  kind="mergesort")
+        self.pareto = table.reset_index(drop=True)
+        best = self.pareto.iloc[0]
+        for j, opt in enumerate(options):
+            if digits[table.index[0], j] != keep[j]:
+                config[opt] = float(best[opt])
         return config
 
 class Graph:
+    """This class is used to enumerate causal paths. Nodes are mapped to integer ids 
+    and the adjacency is stored as CSR arrays (indptr, indices, weights)."""
     def __init__(self, vertices):
         # No. of vertices
-        self.V = vertices
+        self.V = list(vertices)
+        self.index = {v: i for i, v in enumerate(self.V)}
         # default dictionary to store graph
         self.graph = defaultdict(list)
+        self.weights = {}
+        self.csr = None
 
-    def add_edge(self, u, v):
-        self.graph[u].append(v)
+    def add_edge(self, u, v, weight=1.0):
+        if v not in self.graph[u]:
+            self.graph[u].append(v)
+        self.weights[(u, v)] = weight
+        self.csr = None
 
-    def get_all_paths_util(self, u, visited, path):
+    def build_csr(self):
+        """This function is used to build the CSR adjacency arrays"""
+        n = len(self.V)
+        counts = np.zeros(n + 1, dtype=np.int64)
+        for u in self.graph:
+            counts[self.index[u] + 1] = len(self.graph[u])
+        indptr = np.cumsum(counts)
+        indices = np.zeros(indptr[-1], dtype=np.int64)
+        data = np.zeros(indptr[-1], dtype=np.float64)
+        for u, nbrs in self.graph.items():
+            start = indptr[self.index[u]]
+            for k, v in enumerate(nbrs):
+                indices[start + k] = self.index[v]
+                data[start + k] = abs(self.weights[(u, v)])
+        # normalize so that path scores never increase along a path
+        if len(data) and data.max() > 0:
+            data = data / data.max()
+        self.csr = (indptr.tolist(), indices.tolist(), data.tolist())
+        return self.csr
 
-        visited[u]= True
-        path.append(u)
-        # If current vertex is same as destination, then print
-        if self.graph[u] == []:
-            try:
-                if self.path:
-                    self.path.append(path[:])
-            except AttributeError:
-                    self.path=[path[:]]
-        else:
-            for i in self.graph[u]:
-                if visited[i]== False:
-                    self.get_all_paths_util(i, visited, path)
-
-        # remove current vertex from path[] and mark it as unvisited
-        path.pop()
-        visited[u]= False
-
-    def get_all_paths(self, s):
-        # mark all the vertices as not visited
-        visited = {}
-        for i in self.V:
-            visited[i] = False
-        # create an array to store paths
-        path = []
-        # call the recursive helper function to print all paths
-        self.get_all_paths_util(s, visited, path)
-  
+    def iter_paths(self, s, max_length=None):
+        """This function is used to lazily enumerate simple paths from s. A path ends 
+        at a node without outgoing edges or when it has max_length edges.
+        Yields
+        ------
+            path: list of node names
+        """
+        indptr, indices, _ = self.csr or self.build_csr()
+        src = self.index[s]
+        visited = [False] * len(self.V)
+        visited[src] = True
+        path = [src]
+        stack = [indptr[src]]
+        while stack:
+            u = path[-1]
+            pos = stack[-1]
+            end = indptr[u + 1]
+            if indptr[u] == end or (max_length is not None and len(path) > max_length):
+                yield [self.V[i] for i in path]
+                pos = end
+            while pos < end and visited[indices[pos]]:
+                pos += 1
+            if pos < end:
+                stack[-1] = pos + 1
+                v = indices[pos]
+                visited[v] = True
+                path.append(v)
+                stack.append(indptr[v])
+            else:
+                # remove current vertex from path and mark it as unvisited
+                visited[path.pop()] = False
+                stack.pop()
+
+    def top_k_paths(self, s, k, max_length=None):
+        """This function is used to find the k complete paths from s with the highest 
+        score, the product of the normalized edge weights. Scores never increase 
+        along a path, so a best-first search can stop at the k-th complete path.
+        Returns
+        -------
+            paths: list of paths, best first
+        """
+        indptr, indices, data = self.csr or self.build_csr()
+        src = self.index[s]
+        counter = itertools.count()
+        heap = [(-1.0, next(counter), (src,))]
+        paths = []
+        while heap and len(paths) < k:
+            score, _, path = heapq.heappop(heap)
+            u = path[-1]
+            if indptr[u] == indptr[u + 1] or (max_length is not None 
+                                              and len(path) > max_length):
+                paths.append([self.V[i] for i in path])
+                continue
+            for pos in range(indptr[u], indptr[u + 1]):
+                v = indices[pos]
+                if v not in path:
+                    heapq.heappush(heap, (score * data[pos], next(counter), path + (v,)))
+        return paths
+
+    def get_all_paths(self, s, max_length=None):
+        """This function is used to get all the paths from s as a list"""
+        self.path = list(self.iter_paths(s, max_length))
+        return self.path
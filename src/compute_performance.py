@@ -1,13 +1,13 @@
 from Configuration import Config as cfg
 from multiprocessing import Process
-from apscheduler.schedulers.background import BackgroundScheduler
+from sampler import SysfsSampler
+from inference_client import InferenceClient
 
 import os 
 import sys
 import subprocess
 import time
 import json
-import requests
 import numpy as np
 
 class ComputePerformance(object):
@@ -15,28 +15,23 @@ class ComputePerformance(object):
     def __init__(self):
         print ("[STATUS]: Initializing Compute Performance Class")
         self.cur_sys = self.get_sys_name()
-        self.url = 'http://localhost:5000/api'
-        self.total_power = list()
-        self.gpu_power = list()
-        self.cpu_power = list()
-        self.total_temp = list()
-        self.gpu_temp = list()
-        self.cpu_temp = list()
-        
-        # create scheduler
-        job_defaults = {"coalesce":False,
-                         "max_instances":2
-        }
-        self.sched=BackgroundScheduler(job_defaults=job_defaults)
-        # add background job
-        self.sched.start()
-        self.sched.add_job(self.compute_power,"interval",seconds=0.5)
-        self.sched.add_job(self.compute_temp,"interval",seconds=0.5)        
+        self.url = cfg.inference["url"]
+        self.SAMPLE_RATE = 10
+        # one persistent connection, warmed up before the measurement
+        self.client = InferenceClient(self.url, cfg.inference["socket"],
+                                      cfg.inference["timeout"],
+                                      cfg.inference["retries"])
+        self.client.warm_up(cfg.inference["warm_up"])
+        # power and temperature sensors sampled in the background
+        self.sampler = self.create_sampler()
+        self.sampler.start()
         # start        
         self.inference_time=self.compute_inference_time()
         # end
-        self.sched.shutdown()
+        self.sampler.stop()
         self.store_output_metrics()
+        self.sampler.close()
+        self.client.close()
     
     def get_sys_name(self):
         """This function is used to determine the system id
@@ -48,75 +43,50 @@ class ComputePerformance(object):
         sys_name=cfg.sys_id_dict[sys_id]
         return sys_name         
     
-    def compute_power(self):
-        """This function is used to read power consumption using from INA monitor 
-        """
-        tot=cfg.systems[self.cur_sys]["power"]["total"]
-        gpu=cfg.systems[self.cur_sys]["power"]["gpu"]
-        cpu=cfg.systems[self.cur_sys]["power"]["cpu"]
-        try:
-            
-            self.total_power.append(subprocess.getstatusoutput("cat {0}".format(tot))[1])
-            self.gpu_power.append(subprocess.getstatusoutput("cat {0}".format(gpu))[1])
-            self.cpu_power.append(subprocess.getstatusoutput("cat {0}".format(cpu))[1])
-        except AttributeError:
-            print("[ERROR]: invalid power file ")
-    
-    def compute_temp(self):
-        """This function is used to read power consumption using from INA monitor 
+    def create_sampler(self, root="/"):
+        """This function is used to create the sampler of the INA power monitor and 
+        the thermal zones of the current system
         """
-        tot=cfg.systems[self.cur_sys]["temperature"]["total"]
-        gpu=cfg.systems[self.cur_sys]["temperature"]["gpu"]
-        cpu=cfg.systems[self.cur_sys]["temperature"]["cpu"]
-        #try:
-            
-        self.total_temp.append(subprocess.getstatusoutput("cat {0}".format(tot))[1])
-        self.gpu_temp.append(subprocess.getstatusoutput("cat {0}".format(gpu))[1])
-        self.cpu_temp.append(subprocess.getstatusoutput("cat {0}".format(cpu))[1])
-            
-        #except AttributeError:
-        #    print("[ERROR]: invalid temperature file ")
+        return SysfsSampler.from_config(cfg.systems[self.cur_sys], 
+                                        rate=self.SAMPLE_RATE, root=root)
     
     def compute_inference_time(self):
-        """This function is used to compute inference time
+        """This function is used to compute inference time, the mean server side
+        time of the timed requests. The latency percentiles are kept in self.latency
         """
-        
-        r=requests.post(self.url,json={'connect':'yes',})             
-        duration= json.loads(r.json())     
-        return duration["time"]         
+        result = self.client.run(cfg.inference["requests"])
+        self.latency = result
+        return float(np.nanmean(result["server_times"]))
         
     
     def store_output_metrics(self):
-        """This file is used to return output data 
+        """This file is used to return output data. The cur_*_power energies keep
+        the scale of Data/, the sum of power samples read every 0.5 s, the 
+        cur_*_energy keys are the trapezoidal integral in mJ. Temperature is the 
+        mean of the samples
         """
-        # total power
-        self.total_power=[int(i) if i is not None else 0 for i in self.total_power]    
-        self.total_power=np.sum(self.total_power)
-        # gpu power
-        self.gpu_power=[int(i) if i is not None else 0 for i in self.gpu_power]    
-        self.gpu_power=np.sum(self.gpu_power)
-        # cpu power
-        self.cpu_power=[int(i) if i is not None else 0 for i in self.cpu_power]    
-        self.cpu_power=np.sum(self.cpu_power)
-        
-        # total temp
-        self.total_temp=[int(i) if i is not None else 0 for i in self.total_temp]    
-        self.total_temp=np.mean(self.total_temp)
-        # gpu temp
-        self.gpu_temp=[int(i) if i is not None else 0 for i in self.gpu_temp]    
-        self.gpu_temp=np.mean(self.gpu_temp)
-        # cpu temp
-        self.cpu_temp=[int(i) if i is not None else 0 for i in self.cpu_temp]    
-        self.cpu_temp=np.mean(self.cpu_temp)
-        
+        channels = self.sampler.names
+        def energy(name):
+            return self.sampler.energy(name) if name in channels else 0
+        def energy_sum(name):
+            return self.sampler.energy_sum(name) if name in channels else 0
+        def temp(name):
+            return self.sampler.mean(name) if name in channels else 0
         # output
-        output={'cur_total_power' : int(self.total_power),
-                'cur_gpu_power' :  int(self.gpu_power),
-                'cur_cpu_power' : int(self.cpu_power),
+        output={'cur_total_power' : int(energy_sum("total_power")),
+                'cur_gpu_power' :  int(energy_sum("gpu_power")),
+                'cur_cpu_power' : int(energy_sum("cpu_power")),
+                'cur_total_energy' : energy("total_power"),
+                'cur_gpu_energy' : energy("gpu_power"),
+                'cur_cpu_energy' : energy("cpu_power"),
                 'cur_inference' : float(self.inference_time),
-                'cur_total_temp' : float(self.total_temp),
-                'cur_gpu_temp' : float(self.gpu_temp),
-                'cur_cpu_temp' : float(self.cpu_temp)}
+                'cur_total_temp' : float(temp("total_temperature")),
+                'cur_gpu_temp' : float(temp("gpu_temperature")),
+                'cur_cpu_temp' : float(temp("cpu_temperature")),
+                'cur_latency_p50' : self.latency["p50"],
+                'cur_latency_p95' : self.latency["p95"],
+                'cur_latency_p99' : self.latency["p99"],
+                'cur_throughput' : float(np.nanmean(self.latency["throughputs"]))}
         with open('measurement','w') as f:
             json.dump(output, f)
 
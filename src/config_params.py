@@ -1,6 +1,8 @@
 import os 
 import sys
 import subprocess
+import numpy as np
+import pandas as pd
 from cadet.Configuration import Config as cfg
 
 class ConfigParams(object):
@@ -202,3 +204,171 @@ class ConfigParams(object):
         """This function is used to set sched rt runtime us value"""
         os.system ("sysctl kernel.sched_rt_runtime_us={0}".format(val))
 
+
+class ConfigApplier(object):
+    """This class is used to apply configurations incrementally. The applied state
+    is remembered, only the knobs that differ from it are written and all the 
+    writes of a configuration go through one privileged helper invocation.
+    """
+    SYSCTLS = {"cache_pressure": "vm.vfs_cache_pressure",
+               "swappiness": "vm.swappiness",
+               "dirty_bg_ratio": "vm.dirty_background_ratio",
+               "dirty_ratio": "vm.dirty_ratio",
+               "drop_caches": "vm.drop_caches",
+               "sched_child_runs_first": "kernel.sched_child_runs_first",
+               "sched_rt_runtime": "kernel.sched_rt_runtime_us"}
+    POLICIES = {0: "cfq", 1: "noop"}
+    # drop_caches is an action rather than a state, it is repeated every time
+    ACTIONS = ["drop_caches"]
+
+    def __init__(self, cur_sys, big_cores, columns,
+                 helper="./shells/apply_config.sh"):
+        print("[STATUS]: Initializing ConfigApplier Class")
+        self.cur_sys = cur_sys
+        self.big_cores = big_cores
+        self.columns = columns
+        self.helper = helper
+        self.ENABLE = "1"
+        self.knobs = ["core1_status", "core2_status", "core3_status",
+                      "core_freq", "gpu_freq", "emc_freq", "policy"]
+        self.knobs.extend(self.SYSCTLS)
+        # unknown until the first configuration is applied
+        self.state = {}
+
+    def get_values(self, cur_config):
+        return {knob: cur_config[self.columns.index(knob)] for knob in self.knobs
+                if knob in self.columns}
+
+    def diff(self, cur_config):
+        """This function is used to get the knobs that differ from the applied state
+        Returns
+        -------
+            changes: dict of knob to new value
+        """
+        changes = {}
+        for knob, val in self.get_values(cur_config).items():
+            if val is None or knob in self.ACTIONS:
+                continue
+            if knob not in self.state or str(self.state[knob]) != str(val):
+                changes[knob] = val
+        return changes
+
+    def get_actions(self, cur_config):
+        """This function is used to get the actions a configuration requests, they
+        are not part of the applied state and do not change the clocks
+        Returns
+        -------
+            actions: dict of action to value
+        """
+        return {knob: val for knob, val in self.get_values(cur_config).items()
+                if knob in self.ACTIONS and val is not None and str(val) != "0"}
+
+    def read_current(self, filename):
+        try:
+            with open(filename, "r") as f:
+                return f.read().strip()
+        except (IOError, OSError):
+            return "0"
+
+    def plan(self, changes, actions=None):
+        """This function is used to order the changes of a configuration. Cores are
+        brought online before the frequencies are set and taken offline after. When
+        the clocks go up the memory clock is raised first, when they go down it is 
+        lowered last, so the cpu and gpu never run ahead of the memory clock. The
+        actions run last, e.g. caches are dropped after the new state is written.
+        Returns
+        -------
+            commands: list of helper lines
+        """
+        cores = cfg.systems[self.cur_sys]["cpu"]["cores"]
+        online, offline, clocks, rest = [], [], [], []
+        for knob in ("core1_status", "core2_status", "core3_status"):
+            if knob in changes:
+                cpu = cores[knob.split("_")[0]]
+                line = "core_status {0} {1}".format(cpu, changes[knob])
+                if str(changes[knob]) == self.ENABLE:
+                    online.append(line)
+                else:
+                    offline.append(line)
+        if "core_freq" in changes:
+            cur = self.state.get("core_freq") or self.read_current(
+                  "/sys/devices/system/cpu/{0}/cpufreq/scaling_cur_freq".format(
+                  cores["core0"]))
+            clocks.append("core_freq {0} {1} {2}".format(self.cur_sys,
+                          changes["core_freq"], cur))
+        if "gpu_freq" in changes:
+            cur = self.state.get("gpu_freq") or self.read_current(
+                  cfg.systems[self.cur_sys]["gpu"]["frequency"]["current"])
+            clocks.append("gpu_freq {0} {1} {2}".format(self.cur_sys,
+                          changes["gpu_freq"], cur))
+        if "emc_freq" in changes:
+            emc = "emc_freq {0} {1}".format(self.cur_sys, changes["emc_freq"])
+            cur = self.state.get("emc_freq")
+            if cur is not None and float(changes["emc_freq"]) < float(cur):
+                clocks.append(emc)
+            else:
+                clocks.insert(0, emc)
+        if "policy" in changes:
+            if changes["policy"] in self.POLICIES:
+                rest.append("policy {0}".format(self.POLICIES[changes["policy"]]))
+            else:
+                print("[ERROR]: Invalid policy value")
+        for knob, key in self.SYSCTLS.items():
+            if knob in changes:
+                rest.append("sysctl {0}={1}".format(key, changes[knob]))
+        for knob, val in (actions or {}).items():
+            rest.append("sysctl {0}={1}".format(self.SYSCTLS[knob], val))
+        return online + clocks + offline + rest
+
+    def apply(self, cur_config):
+        """This function is used to apply a configuration
+        Returns
+        -------
+            changes: dict of the knobs that were written, the actions are run but
+                     not returned, so they alone do not require settling
+        """
+        changes = self.diff(cur_config)
+        commands = self.plan(changes, self.get_actions(cur_config))
+        if not commands:
+            return changes
+        proc = subprocess.run(["sudo", "sh", self.helper],
+                              input="\n".join(commands) + "\n",
+                              stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                              universal_newlines=True)
+        if proc.returncode != 0:
+            print("[CONFIG ERROR]: {0}".format(proc.stdout.strip()))
+            # the device state is unknown, everything is written next time
+            self.state = {}
+            return changes
+        self.state.update(changes)
+        return changes
+
+def order_configs(params, columns, weights=None):
+    """This function is used to order configurations so consecutive configurations
+    differ in as few knobs as possible, a greedy nearest neighbour tour over the 
+    weighted hamming distance
+    Parameters
+    ----------
+        params: list of configurations
+        weights: dict of column to the cost of changing it, 1 by default
+    Returns
+    -------
+        order: list of indices into params
+    """
+    if len(params) == 0:
+        return []
+    df = pd.DataFrame([list(p)[:len(columns)] for p in params],
+                      columns=columns[:len(params[0])])
+    codes = np.column_stack([pd.factorize(df[col].astype(str))[0]
+                             for col in df.columns])
+    w = np.array([(weights or {}).get(col, 1.0) for col in df.columns])
+    order = [0]
+    visited = np.zeros(len(params), dtype=bool)
+    visited[0] = True
+    for _ in range(len(params) - 1):
+        dist = ((codes != codes[order[-1]]) * w).sum(axis=1)
+        dist[visited] = np.inf
+        nxt = int(np.argmin(dist))
+        visited[nxt] = True
+        order.append(nxt)
+    return order
@@ -0,0 +1,130 @@
+import random
+import numpy as np
+
+class ConfigSpace(object):
+    """This class is used to sample configurations without enumerating the product
+    of the option domains. Every option is stored as its list of values and a
+    configuration is a mixed radix number, the i-th digit selects the value of the
+    i-th option, so the index of any configuration can be decoded on demand.
+    """
+    def __init__(self, options):
+        """
+        Parameters
+        ----------
+            options: list of option domains, a value that is a tuple fills several
+                     columns, e.g. the on/off status of all the cores
+        """
+        self.options = [[v if isinstance(v, tuple) else (v,) for v in values]
+                        for values in options]
+        self.radix = [len(values) for values in self.options]
+        # python integers, the size can exceed 64 bits
+        self.size = 1
+        for r in self.radix:
+            self.size *= r
+
+    def decode_digits(self, digits):
+        """This function is used to build the configuration of a list of digits"""
+        config = ()
+        for values, d in zip(self.options, digits):
+            config += values[int(d)]
+        return config
+
+    def get_digits(self, index):
+        digits = []
+        for r in reversed(self.radix):
+            index, d = divmod(index, r)
+            digits.append(d)
+        return digits[::-1]
+
+    def decode(self, index):
+        """This function is used to get the configuration of an index"""
+        if not 0 <= index < self.size:
+            raise IndexError("configuration index out of range")
+        return self.decode_digits(self.get_digits(index))
+
+    def encode(self, digits):
+        index = 0
+        for r, d in zip(self.radix, digits):
+            index = index * r + int(d)
+        return index
+
+    def uniform(self, n, seed=None):
+        """This function is used to draw distinct configurations uniformly,
+        random.sample on a range does not materialize the range"""
+        rng = random.Random(seed)
+        if 2 * n >= self.size:
+            for index in rng.sample(range(self.size), min(n, self.size)):
+                yield self.decode(index)
+            return
+        # rejection sampling, ranges longer than sys.maxsize cannot be sampled
+        seen = set()
+        while len(seen) < n:
+            index = rng.randrange(self.size)
+            if index not in seen:
+                seen.add(index)
+                yield self.decode(index)
+
+    def lhs_digits(self, n, rng):
+        """This function is used to draw a latin hypercube design, every option is
+        split in n strata and every stratum is used once"""
+        digits = np.empty((n, len(self.radix)), dtype=np.int64)
+        for j, r in enumerate(self.radix):
+            u = (rng.permutation(n) + rng.random(n)) / n
+            digits[:, j] = np.minimum((u * r).astype(np.int64), r - 1)
+        return digits
+
+    def sobol_digits(self, n, rng):
+        """This function is used to draw a scrambled sobol design"""
+        from scipy.stats import qmc
+        sampler = qmc.Sobol(d=len(self.radix), scramble=True, seed=rng)
+        # balanced sobol designs have a power of two points
+        m = int(np.ceil(np.log2(max(n, 2))))
+        u = sampler.random_base2(m)[:n]
+        radix = np.array(self.radix)
+        return np.minimum((u * radix).astype(np.int64), radix - 1)
+
+    def stream(self, n, method="uniform", seed=None,
+               max_rounds=10):
+        """This function is used to generate n distinct configurations on demand
+        Parameters
+        ----------
+            method: uniform, lhs or sobol
+            max_rounds: designs drawn at most to replace duplicate points, small
+                        spaces can give fewer than n configurations
+        Returns
+        -------
+            generator of configuration tuples
+        """
+        if method == "uniform":
+            for config in self.uniform(n, seed):
+                yield config
+            return
+        if method == "lhs":
+            draw = self.lhs_digits
+        elif method == "sobol":
+            draw = self.sobol_digits
+        else:
+            raise ValueError("unknown sampling method {0}".format(method))
+        rng = np.random.default_rng(seed)
+        n = min(n, self.size)
+        seen = set()
+        for _ in range(max_rounds):
+            for digits in draw(n - len(seen), rng):
+                index = self.encode(digits)
+                if index in seen:
+                    continue
+                seen.add(index)
+                yield self.decode_digits(digits)
+            if len(seen) >= n:
+                return
+
+    def get_domains(self):
+        """This function is used to get the candidate values of every column
+        Returns
+        -------
+            domains: list with the sorted set of values of every column
+        """
+        domains = []
+        for values in self.options:
+            domains.extend(sorted(set(col)) for col in zip(*values))
+        return domains
@@ -0,0 +1,128 @@
+import os
+import json
+import shutil
+import hashlib
+import numpy as np
+import pandas as pd
+
+class Dataset(object):
+    """This class is used to load the Data/ csv corpus through a columnar binary cache.
+    Every data.csv is parsed once and stored as one .npy file per column, later
+    loads memory-map only the requested columns.
+    """
+    def __init__(self, data_dir="Data", cache_dir=None,
+                 validate="mtime"):
+        print("[STATUS]: Initializing Dataset Class")
+        self.data_dir = data_dir
+        if cache_dir is None:
+            cache_dir = os.path.join(data_dir, ".cache")
+        self.cache_dir = cache_dir
+        if validate not in ("mtime", "hash"):
+            raise ValueError("validate must be 'mtime' or 'hash'")
+        self.validate = validate
+        self.META = "meta.json"
+
+    def get_path(self, kind, mode, hardware,
+                 software):
+        """This function is used to get the csv path of a dataset
+        Parameters
+        ----------
+            kind: Initial, Bug, GroundTruth, Metrics or Output
+            mode: Single or Multi (None for Metrics and Output)
+            hardware: TX1, TX2 or Xavier
+            software: Image, NLP, Speech, x264 or SQLite
+        Returns
+        -------
+            path: path of data.csv
+        """
+        parts = [self.data_dir, kind]
+        if mode is not None:
+            parts.append(mode)
+        parts.extend([hardware, software, "data.csv"])
+        return os.path.join(*parts)
+
+    def load(self, kind, mode, hardware,
+             software, columns=None, dtype=np.float64):
+        """This function is used to load a dataset keyed by hardware, software and mode
+        Returns
+        -------
+            df: dataframe holding the requested columns
+        """
+        path = self.get_path(kind, mode, hardware, software)
+        key = os.path.join(*[p for p in (kind, mode, hardware, software) if p is not None])
+        return self.read_csv(path, columns, dtype, key)
+
+    def read_csv(self, path, columns=None,
+                 dtype=np.float64, key=None):
+        """This function is used to read a csv file through the cache. It is a
+        drop-in replacement for pd.read_csv(path)[columns].
+        """
+        if key is None:
+            key = hashlib.sha1(os.path.abspath(path).encode()).hexdigest()
+        cache_path = os.path.join(self.cache_dir, key)
+        meta = self.read_meta(cache_path)
+        if not self.is_valid(meta, path):
+            meta = self.build(path, cache_path)
+        if columns is None:
+            columns = meta["columns"]
+        index = {col: i for i, col in enumerate(meta["columns"])}
+        data = {}
+        for col in columns:
+            if col not in index:
+                raise KeyError("column {0} not in {1}".format(col, path))
+            arr = np.load(os.path.join(cache_path, "{0}.npy".format(index[col])),
+                          mmap_mode="r")
+            data[col] = np.asarray(arr, dtype=dtype)
+        return pd.DataFrame(data, columns=list(columns))
+
+    def read_meta(self, cache_path):
+        """This function is used to read the metadata of a cached dataset"""
+        try:
+            with open(os.path.join(cache_path, self.META), "r") as f:
+                return json.load(f)
+        except (IOError, ValueError):
+            return None
+
+    def file_hash(self, path):
+        """This function is used to compute the sha1 digest of a file"""
+        digest = hashlib.sha1()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def is_valid(self, meta, path):
+        """This function is used to check whether a cached dataset is up to date
+        with its source csv"""
+        if meta is None:
+            return False
+        stat = os.stat(path)
+        if self.validate == "hash":
+            return meta["sha1"] == self.file_hash(path)
+        return (meta["mtime_ns"] == stat.st_mtime_ns
+                and meta["size"] == stat.st_size)
+
+    def build(self, path, cache_path):
+        """This function is used to convert a csv file into one .npy file per column"""
+        print("[STATUS]: caching {0}".format(path))
+        stat = os.stat(path)
+        df = pd.read_csv(path)
+        # the metadata is written last, a partial cache is never valid
+        if os.path.isdir(cache_path):
+            shutil.rmtree(cache_path)
+        os.makedirs(cache_path)
+        columns = [str(col) for col in df.columns]
+        for i, col in enumerate(df.columns):
+            values = pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=np.float64)
+            np.save(os.path.join(cache_path, "{0}.npy".format(i)), values)
+        meta = {"source": os.path.abspath(path),
+                "mtime_ns": stat.st_mtime_ns,
+                "size": stat.st_size,
+                "sha1": self.file_hash(path),
+                "rows": len(df),
+                "columns": columns}
+        tmp = os.path.join(cache_path, self.META + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp, os.path.join(cache_path, self.META))
+        return meta
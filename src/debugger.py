@@ -0,0 +1,138 @@
+import numpy as np
+import pandas as pd
+
+class Debugger(object):
+    """This class is used to resolve a set of bugs against one shared causal model.
+    The model is learned once per round, every open bug gets a repair from it and
+    the repairs that need measurements are scheduled together. The measurements are
+    added to the data before the next round.
+    """
+    def __init__(self, CM, df, columns,
+                 tabu_edges, objectives, domains,
+                 query, num_paths, max_path_length=None,
+                 cache=None, measure=None, max_rounds=5,
+                 incremental=False, top_k=None, weighted_paths=False):
+        print("[STATUS]: Initializing Debugger Class")
+        if not objectives:
+            raise ValueError("at least one objective is required")
+        self.CM = CM
+        self.df = df
+        self.columns = columns
+        self.tabu_edges = tabu_edges
+        self.objectives = objectives
+        self.domains = domains
+        self.query = query
+        self.num_paths = num_paths
+        self.max_path_length = max_path_length
+        self.cache = cache
+        self.measure = measure
+        self.max_rounds = max_rounds
+        # update NOTEARS from the measurements appended between rounds
+        self.incremental = incremental
+        # with top_k only the k best paths by NOTEARS edge weights are enumerated
+        self.top_k = top_k
+        self.weighted_paths = weighted_paths
+
+    def learn(self):
+        """This function is used to learn the shared causal model and its paths"""
+        self.G, di_edges, bi_edges = self.CM.learn_structure(self.df, self.tabu_edges,
+                                                             self.columns,
+                                                             cache=self.cache,
+                                                             incremental=self.incremental)
+        # identify causal paths
+        weights = self.CM.edge_weights if self.weighted_paths else None
+        self.paths = self.CM.get_causal_paths(self.columns, di_edges, bi_edges,
+                                              self.objectives, self.max_path_length,
+                                              self.top_k, weights)
+        # rank causal paths
+        for key in self.paths:
+            if len(self.paths[key]) > self.num_paths:
+                self.paths[key] = self.CM.compute_path_causal_effect(self.df, self.paths[key],
+                                                                     self.G, self.num_paths)
+
+    def get_bug_val(self, bug):
+        return {obj: float(bug[obj]) for obj in self.objectives}
+
+    def is_fixed(self, bug_val, measured):
+        """This function is used to check whether a measurement fixes a bug"""
+        for obj in self.objectives:
+            if self.query == "best":
+                target = np.min(self.df[obj])
+            else:
+                target = (1 - self.query) * bug_val[obj]
+            if not measured[obj] < target:
+                return False
+        return True
+
+    def recommend(self, bug):
+        """This function is used to get a repair of one bug from the shared model,
+        with several objectives the repair is taken from the pareto front of the 
+        predicted trade-offs
+        Returns
+        -------
+            config: dict with the repaired option values
+        """
+        config = {opt: bug[opt] for opt in self.domains}
+        if len(self.objectives) > 1:
+            return self.CM.compute_pareto_recommendations(self.df, self.paths, self.G,
+                                                          self.query, self.objectives,
+                                                          self.get_bug_val(bug),
+                                                          config, self.domains)
+        return self.CM.compute_individual_treatment_effect(self.df, self.paths, self.G,
+                                                           self.query, self.objectives,
+                                                           self.get_bug_val(bug),
+                                                           config, self.domains)
+
+    def run(self, bugs):
+        """This function is used to resolve all the bugs
+        Parameters
+        ----------
+            bugs: dataframe, one bug configuration per row
+        Returns
+        -------
+            records: dataframe with one result record per bug
+        """
+        records = []
+        for i in range(len(bugs)):
+            bug = bugs.iloc[i]
+            record = {"bug": bugs.index[i], "status": "open", "rounds": 0}
+            for obj, val in self.get_bug_val(bug).items():
+                record["bug_" + obj] = val
+            records.append(record)
+        for rnd in range(self.max_rounds):
+            open_bugs = [i for i, r in enumerate(records) if r["status"] == "open"]
+            if not open_bugs:
+                break
+            print("[STATUS]: round {0}, {1} open bugs".format(rnd, len(open_bugs)))
+            self.learn()
+            configs = []
+            for i in open_bugs:
+                config = self.recommend(bugs.iloc[i])
+                records[i]["rounds"] += 1
+                for opt, val in config.items():
+                    records[i]["fix_" + opt] = val
+                if len(self.objectives) > 1 and len(self.CM.pareto):
+                    # predicted trade-off of the repair
+                    front = self.CM.pareto
+                    records[i]["front_size"] = int((front["front"] == 0).sum())
+                    for obj in self.objectives:
+                        records[i]["pred_" + obj] = front.loc[0, "pred_" + obj]
+                configs.append(config)
+            if self.measure is None:
+                for i in open_bugs:
+                    records[i]["status"] = "recommended"
+                break
+            # measure all the repairs of this round together
+            results = self.measure(configs)
+            rows = []
+            for i, measured in zip(open_bugs, results):
+                for obj in self.objectives:
+                    records[i]["measured_" + obj] = measured[obj]
+                if "match" in measured:
+                    records[i]["match"] = measured["match"]
+                if self.is_fixed(self.get_bug_val(bugs.iloc[i]), measured):
+                    records[i]["status"] = "fixed"
+                rows.append({col: measured.get(col, np.nan) for col in self.columns})
+            new = pd.DataFrame(rows, columns=self.columns).dropna()
+            self.df = pd.concat([self.df, new], ignore_index=True)
+        return pd.DataFrame(records)
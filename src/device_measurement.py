@@ -0,0 +1,112 @@
+import numpy as np
+
+from cadet.config_params import ConfigApplier
+from cadet.measurement_daemon import MeasurementDaemon
+from cadet.settle import SettleDetector
+from cadet.Configuration import Config as cfg
+
+class DeviceMeasurement(object):
+    """This class is used to measure repairs on the device. A repair is applied with
+    ConfigApplier, the measurement starts once the clocks and temperatures settled
+    and the MeasurementDaemon measures the running workload server. It answers the
+    same calls as ReplayMeasurement.
+    """
+    def __init__(self, applier, settle, daemon):
+        """
+        Parameters
+        ----------
+            applier: ConfigApplier of the hardware and os knobs
+            settle: SettleDetector waited on after a change
+            daemon: MeasurementDaemon of the running workload server
+        """
+        print("[STATUS]: Initializing DeviceMeasurement Class")
+        self.applier = applier
+        self.settle = settle
+        self.daemon = daemon
+        # knobs of the applier and the column names used in Data/
+        self.knobs = list(applier.columns)
+        self.knob_columns = [cfg.option_columns.get(knob, knob) for knob in self.knobs]
+
+    @classmethod
+    def from_config(cls, sys_name):
+        """This function is used to create the backend of a system from the settle
+        and inference sections of the configuration and the pid file of the 
+        workload server"""
+        applier = ConfigApplier(sys_name, cfg.systems[sys_name]["cpu"]["cores"],
+                                list(cfg.hardware_columns[sys_name]))
+        settle = cfg.settle
+        settle = SettleDetector.from_config(cfg.systems[sys_name],
+                                            rate=settle["rate"],
+                                            window=settle["window"],
+                                            freq_tol=settle["freq_tol"],
+                                            temp_tol=settle["temp_tol"],
+                                            timeout=settle["timeout"])
+        inference = cfg.inference
+        workload_pid = MeasurementDaemon.get_workload_pid(cfg.workload_pid_file)
+        daemon = MeasurementDaemon(sys_name, workload_pid, url=inference["url"],
+                                   socket_path=inference["socket"],
+                                   warm_up=inference["warm_up"],
+                                   num_requests=inference["requests"],
+                                   timeout=inference["timeout"],
+                                   retries=inference["retries"])
+        return cls(applier, settle, daemon)
+
+    @staticmethod
+    def read_cpu_times():
+        with open("/proc/stat", "r") as f:
+            times = np.array(f.readline().split()[1:], dtype=np.float64)
+        # idle and iowait
+        return times.sum(), times[3:5].sum()
+
+    @staticmethod
+    def to_knob_value(val):
+        # values read back from csv are floats, the helper scripts expect integers
+        if isinstance(val, float) and val.is_integer():
+            return int(val)
+        return val
+
+    def measure(self, config):
+        """This function is used to measure one configuration
+        Parameters
+        ----------
+            config: dict with the values of the repaired options, options missing
+                    from it keep their current value
+        Returns
+        -------
+            measured: dict of the configuration and the measured columns, the 
+                      energy columns are on the scale of Data/ so the rows can be
+                      compared with the bugs and appended to the data
+        """
+        cur_config = [self.to_knob_value(config.get(col)) for col in self.knob_columns]
+        if self.applier.apply(cur_config):
+            self.settle.wait()
+        total, idle = self.read_cpu_times()
+        data = self.daemon.measure()
+        total_end, idle_end = self.read_cpu_times()
+        busy = (total_end - total) - (idle_end - idle)
+        measured = dict(config)
+        measured.update(data["perf"].iloc[0].to_dict())
+        measured.update({"inference_time": data["cur_inference"],
+                         "total_energy_consumption": data["cur_total_power"],
+                         "gpu_energy_consumption": data["cur_gpu_power"],
+                         "cpu_energy_consumption": data["cur_cpu_power"],
+                         "total_energy_mj": data["cur_total_energy"],
+                         "gpu_energy_mj": data["cur_gpu_energy"],
+                         "cpu_energy_mj": data["cur_cpu_energy"],
+                         "total_temp": data["cur_total_temp"],
+                         "gpu_temp": data["cur_gpu_temp"],
+                         "cpu_temp": data["cur_cpu_temp"],
+                         "cpu_utilization": 100.0 * busy / max(total_end - total, 1),
+                         "latency_p50": data["cur_latency_p50"],
+                         "latency_p95": data["cur_latency_p95"],
+                         "latency_p99": data["cur_latency_p99"],
+                         "throughput": data["cur_throughput"]})
+        return measured
+
+    def close(self):
+        self.settle.close()
+        self.daemon.close()
+
+    def __call__(self, configs):
+        """This function is used to measure a batch of configurations"""
+        return [self.measure(config) for config in configs]
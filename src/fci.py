@@ -0,0 +1,350 @@
+import itertools
+import numpy as np
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from scipy.special import ndtr
+
+# endpoint marks, mark[i, j] is the mark at j on the edge between i and j
+NULL = 0
+CIRCLE = 1
+ARROW = 2
+TAIL = 3
+
+def fisher_z(corr, n, tests):
+    """This function is used to run a batch of Fisher-z tests from a correlation matrix.
+    The partial correlation of every test is read off the inverse of the correlation
+    submatrix over [x, y, S], all submatrices of one batch are inverted together.
+    Parameters
+    ----------
+        corr: correlation matrix of shape (d, d)
+        n: number of samples
+        tests: integer array of shape (m, 2 + depth), rows are [x, y, *S]
+    Returns
+    -------
+        pvals: array of shape (m,)
+    """
+    tests = np.asarray(tests, dtype=np.intp)
+    if len(tests) == 0:
+        return np.zeros(0)
+    sub = corr[tests[:, :, None], tests[:, None, :]]
+    prec = np.linalg.pinv(sub, hermitian=True)
+    r = -prec[:, 0, 1] / np.sqrt(np.abs(prec[:, 0, 0] * prec[:, 1, 1]))
+    r = np.clip(r, -1 + 1e-12, 1 - 1e-12)
+    dof = max(n - (tests.shape[1] - 2) - 3, 1)
+    z = 0.5 * np.log((1 + r) / (1 - r)) * np.sqrt(dof)
+    return 2 * ndtr(-np.abs(z))
+
+# correlation matrix and sample size of a pool worker, set once by the initializer
+_worker_corr = None
+_worker_n = None
+
+def _init_worker(corr, n):
+    global _worker_corr, _worker_n
+    _worker_corr = corr
+    _worker_n = n
+
+def _run_chunk(tests):
+    return fisher_z(_worker_corr, _worker_n, tests)
+
+class FCI(object):
+    """This class is used to learn a PAG with FCI in process. It is a NumPy
+    alternative to the pycausal/Tetrad backend and returns the same edge strings.
+    """
+    def __init__(self, alpha=0.05, depth=-1,
+                 max_path_length=-1, batch_size=20000, 
+                 n_jobs=1, min_parallel_tests=5000):
+        print("[STATUS]: Initializing FCI Class")
+        self.alpha = alpha
+        self.depth = depth
+        self.max_path_length = max_path_length
+        self.batch_size = batch_size
+        self.n_jobs = n_jobs
+        self.min_parallel_tests = min_parallel_tests
+        self.pool = None
+
+    def fit(self, df, tabu_edges=None):
+        """This function is used to learn a PAG from a dataframe
+        Parameters
+        ----------
+            df: dataframe, one column per node
+            tabu_edges: forbidden (cause, effect) edges
+        Returns
+        -------
+            edges: list of edge strings e.g. "A --> B", "A o-> B", "A <-> B"
+        """
+        self.columns = [str(col) for col in df.columns]
+        X = df.to_numpy(dtype=np.float64)
+        self.n, d = X.shape
+        std = X.std(axis=0)
+        std[std == 0] = 1.0
+        with np.errstate(invalid="ignore", divide="ignore"):
+            self.corr = np.corrcoef(X / std, rowvar=False)
+        self.corr[~np.isfinite(self.corr)] = 0.0
+        np.fill_diagonal(self.corr, 1.0)
+        index = {col: i for i, col in enumerate(self.columns)}
+        self.forbidden = set()
+        for u, v in (tabu_edges or []):
+            if u in index and v in index:
+                self.forbidden.add((index[u], index[v]))
+        adj = ~np.eye(d, dtype=bool)
+        for i, j in self.forbidden:
+            if (j, i) in self.forbidden:
+                adj[i, j] = adj[j, i] = False
+        self.sepset = {}
+        if self.n_jobs > 1:
+            self.pool = ProcessPoolExecutor(max_workers=self.n_jobs, 
+                                            initializer=_init_worker, 
+                                            initargs=(self.corr, self.n))
+        try:
+            # adjacency search
+            adj = self.skeleton(adj)
+            mark = self.initial_marks(adj)
+            self.orient_colliders(mark)
+            # possible-d-sep search, then start the orientation over
+            adj = self.possible_dsep(mark)
+        finally:
+            if self.pool is not None:
+                self.pool.shutdown()
+                self.pool = None
+        mark = self.initial_marks(adj)
+        self.orient_colliders(mark)
+        self.orient_rules(mark)
+        return self.get_edges(mark)
+
+    def run_tests(self, tests):
+        """This function is used to compute the p-values of a list of tests in batches.
+        Large lists are split across the process pool, the chunks are merged back in
+        order so the result does not depend on scheduling."""
+        if self.pool is not None and len(tests) >= self.min_parallel_tests:
+            size = min(self.batch_size, -(-len(tests) // (4 * self.n_jobs)))
+            chunks = [tests[start:start + size] for start in range(0, len(tests), size)]
+            pvals = list(self.pool.map(_run_chunk, chunks))
+        else:
+            pvals = [fisher_z(self.corr, self.n, tests[start:start + self.batch_size])
+                     for start in range(0, len(tests), self.batch_size)]
+        return np.concatenate(pvals) if pvals else np.zeros(0)
+
+    def remove_independent(self, adj, candidates):
+        """This function is used to test candidate separating sets and remove edges.
+        Candidates are tested in one batch and the first independent set of every
+        edge, in candidate order, becomes its separating set.
+        Parameters
+        ----------
+            candidates: list of (x, y, S) in a deterministic order
+        """
+        if not candidates:
+            return False
+        by_size = {}
+        for pos, (x, y, S) in enumerate(candidates):
+            by_size.setdefault(len(S), []).append(pos)
+        pvals = np.zeros(len(candidates))
+        for size, positions in by_size.items():
+            tests = np.array([[candidates[p][0], candidates[p][1]] + list(candidates[p][2])
+                              for p in positions], dtype=np.intp).reshape(len(positions), size + 2)
+            pvals[positions] = self.run_tests(tests)
+        removed = False
+        for pos, (x, y, S) in enumerate(candidates):
+            if adj[x, y] and pvals[pos] > self.alpha:
+                adj[x, y] = adj[y, x] = False
+                self.sepset[(x, y)] = self.sepset[(y, x)] = set(S)
+                removed = True
+        return removed
+
+    def skeleton(self, adj):
+        """This function is used to find the skeleton with the order independent
+        (stable) adjacency search, neighbourhoods are frozen within a depth"""
+        d = len(adj)
+        depth = 0
+        while self.depth < 0 or depth <= self.depth:
+            neighbours = [np.flatnonzero(adj[i]) for i in range(d)]
+            candidates = []
+            for x, y in zip(*np.nonzero(np.triu(adj))):
+                for a, b in ((x, y), (y, x)):
+                    others = [k for k in neighbours[a] if k != b]
+                    if len(others) < depth:
+                        continue
+                    for S in itertools.combinations(others, depth):
+                        candidates.append((x, y, S))
+            if not candidates:
+                break
+            self.remove_independent(adj, candidates)
+            depth += 1
+        return adj
+
+    def initial_marks(self, adj):
+        mark = np.where(adj, CIRCLE, NULL).astype(np.int8)
+        # background knowledge, a forbidden u --> v puts an arrowhead at u
+        for u, v in self.forbidden:
+            if mark[u, v] != NULL:
+                mark[v, u] = ARROW
+        return mark
+
+    def orient_colliders(self, mark):
+        """This function is used to orient unshielded colliders x *-> z <-* y"""
+        adj = mark != NULL
+        d = len(mark)
+        for z in range(d):
+            nbrs = np.flatnonzero(adj[z])
+            for x, y in itertools.combinations(nbrs, 2):
+                if adj[x, y]:
+                    continue
+                if z not in self.sepset.get((x, y), set()):
+                    mark[x, z] = ARROW
+                    mark[y, z] = ARROW
+
+    def possible_dsep_set(self, mark, x):
+        """This function is used to compute Possible-D-SEP(x)"""
+        adj = mark != NULL
+        seen = set()
+        result = set()
+        queue = deque()
+        for y in np.flatnonzero(adj[x]):
+            queue.append((x, y, 1))
+            seen.add((x, y))
+        while queue:
+            prev, cur, length = queue.popleft()
+            result.add(cur)
+            if 0 < self.max_path_length <= length:
+                continue
+            for nxt in np.flatnonzero(adj[cur]):
+                if nxt == prev or nxt == x or (cur, nxt) in seen:
+                    continue
+                collider = mark[prev, cur] == ARROW and mark[nxt, cur] == ARROW
+                if collider or adj[prev, nxt]:
+                    seen.add((cur, nxt))
+                    queue.append((cur, nxt, length + 1))
+        result.discard(x)
+        return result
+
+    def possible_dsep(self, mark):
+        """This function is used to remove edges separated by subsets of Possible-D-SEP"""
+        adj = mark != NULL
+        d = len(adj)
+        pdsep = [self.possible_dsep_set(mark, x) for x in range(d)]
+        depth = 1
+        while self.depth < 0 or depth <= self.depth:
+            candidates = []
+            for x, y in zip(*np.nonzero(np.triu(adj))):
+                for a, b in ((x, y), (y, x)):
+                    others = sorted(pdsep[a] - {b})
+                    if len(others) < depth:
+                        continue
+                    for S in itertools.combinations(others, depth):
+                        candidates.append((x, y, S))
+            if not candidates:
+                break
+            self.remove_independent(adj, candidates)
+            depth += 1
+        return adj
+
+    def orient_rules(self, mark):
+        """This function is used to apply the FCI orientation rules R1-R4 until
+        nothing changes"""
+        changed = True
+        while changed:
+            changed = False
+            changed |= self.rule_1(mark)
+            changed |= self.rule_2(mark)
+            changed |= self.rule_3(mark)
+            changed |= self.rule_4(mark)
+
+    def rule_1(self, mark):
+        # a *-> b o-* c, a and c not adjacent => b --> c
+        changed = False
+        d = len(mark)
+        for b in range(d):
+            for a in np.flatnonzero(mark[:, b] == ARROW):
+                for c in np.flatnonzero(mark[:, b] == CIRCLE):
+                    if c == a or mark[a, c] != NULL:
+                        continue
+                    mark[c, b] = TAIL
+                    mark[b, c] = ARROW
+                    changed = True
+        return changed
+
+    def rule_2(self, mark):
+        # a --> b *-> c or a *-> b --> c, and a *-o c => a *-> c
+        changed = False
+        for a, c in zip(*np.nonzero(mark == CIRCLE)):
+            for b in np.flatnonzero(mark[a] != NULL):
+                if b == c or mark[b, c] == NULL:
+                    continue
+                chain_1 = mark[a, b] == ARROW and mark[b, a] == TAIL and mark[b, c] == ARROW
+                chain_2 = mark[a, b] == ARROW and mark[c, b] == TAIL and mark[b, c] == ARROW
+                if chain_1 or chain_2:
+                    mark[a, c] = ARROW
+                    changed = True
+                    break
+        return changed
+
+    def rule_3(self, mark):
+        # a *-> b <-* c, a *-o d o-* c, a and c not adjacent, d *-o b => d *-> b
+        changed = False
+        for d_, b in zip(*np.nonzero(mark == CIRCLE)):
+            parents = [k for k in np.flatnonzero(mark[:, b] == ARROW) if k != d_]
+            for a, c in itertools.combinations(parents, 2):
+                if mark[a, c] != NULL:
+                    continue
+                if mark[a, d_] == CIRCLE and mark[c, d_] == CIRCLE:
+                    mark[d_, b] = ARROW
+                    changed = True
+                    break
+        return changed
+
+    def rule_4(self, mark):
+        # discriminating path <d, ..., a, b, c> for b with b o-* c
+        changed = False
+        for c, b in zip(*np.nonzero(mark == CIRCLE)):
+            if mark[c, b] != CIRCLE:
+                continue
+            for a in np.flatnonzero(mark[b] == ARROW):
+                if a == c or not self.is_parent(mark, a, c):
+                    continue
+                d = self.discriminating_end(mark, a, b, c)
+                if d is None:
+                    continue
+                if b in self.sepset.get((d, c), set()):
+                    mark[c, b] = TAIL
+                    mark[b, c] = ARROW
+                else:
+                    mark[a, b] = mark[b, a] = ARROW
+                    mark[c, b] = mark[b, c] = ARROW
+                changed = True
+                break
+        return changed
+
+    def is_parent(self, mark, a, c):
+        return mark[a, c] == ARROW and mark[c, a] == TAIL
+
+    def discriminating_end(self, mark, a, b, c):
+        """This function is used to find the end d of a discriminating path
+        <d, ..., a, b, c>, every node between d and b is a collider and a parent of c"""
+        queue = deque([(a, 2)])
+        seen = {a, b, c}
+        while queue:
+            cur, length = queue.popleft()
+            if 0 < self.max_path_length <= length:
+                continue
+            for e in np.flatnonzero(mark[:, cur] == ARROW):
+                if e in seen:
+                    continue
+                if mark[e, c] == NULL:
+                    return e
+                if self.is_parent(mark, e, c) and mark[cur, e] == ARROW:
+                    seen.add(e)
+                    queue.append((e, length + 1))
+        return None
+
+    def get_edges(self, mark):
+        """This function is used to format the PAG as edge strings"""
+        left = {TAIL: "-", CIRCLE: "o", ARROW: "<"}
+        right = {TAIL: "-", CIRCLE: "o", ARROW: ">"}
+        edges = []
+        for i, j in zip(*np.nonzero(np.triu(mark != NULL))):
+            at_i, at_j = mark[j, i], mark[i, j]
+            # keep arrowheads and circles on the right, as Tetrad does
+            if (at_i, at_j) in ((ARROW, CIRCLE), (ARROW, TAIL), (CIRCLE, TAIL)):
+                i, j, at_i, at_j = j, i, at_j, at_i
+            edges.append("{0} {1}-{2} {3}".format(self.columns[i], left[at_i],
+                                                  right[at_j], self.columns[j]))
+        return edges
@@ -0,0 +1,71 @@
+import atexit
+import threading
+
+class FCIEngine(object):
+    """This class is used to run FCI through pycausal with one JVM for the whole
+    process. pycausal cannot restart a JVM once it has been stopped, so the engine
+    starts it on first use and stops it at interpreter exit.
+    """
+    _instance = None
+    _lock = threading.Lock()
+
+    def __init__(self):
+        print("[STATUS]: Initializing FCIEngine Class")
+        from pycausal.pycausal import pycausal as pc
+        from pycausal import search as s
+        self.pc = pc()
+        self.pc.start_vm()
+        self.tetrad = s.tetradrunner()
+        self.tetrad.getAlgorithmParameters(algoId = 'fci', testId = 'fisher-z-test')
+        self.prior = None
+        self.prior_key = None
+        self.running = True
+        atexit.register(self.shutdown)
+
+    @classmethod
+    def get_instance(cls):
+        """This function is used to get the process wide engine
+        Returns
+        -------
+            engine: FCIEngine instance
+        """
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def get_prior(self, tabu_edges):
+        """This function is used to build the prior knowledge, the previous object is
+        reused while the tabu edges are unchanged"""
+        key = frozenset(tuple(edge) for edge in tabu_edges)
+        if key != self.prior_key:
+            from pycausal import prior as p
+            forbid = [list(i) for i in tabu_edges]
+            self.prior = p.knowledge(forbiddirect = forbid)
+            self.prior_key = key
+        return self.prior
+
+    def run(self, df, tabu_edges):
+        """This function is used to learn a PAG using FCI
+        Returns
+        -------
+            edges: list of edge strings e.g. "A --> B"
+        """
+        if not self.running:
+            raise RuntimeError("FCIEngine has been shut down")
+        prior = self.get_prior(tabu_edges)
+        with self._lock:
+            self.tetrad.run(algoId = 'fci', dfs = df, testId = 'fisher-z-test',
+                            priorKnowledge = prior, depth = -1, maxPathLength = -1,
+                            completeRuleSetUsed = False, verbose = False)
+            edges = self.tetrad.getEdges()
+        return list(edges)
+
+    def shutdown(self):
+        """This function is used to stop the JVM"""
+        if self.running:
+            self.running = False
+            try:
+                self.pc.stop_vm()
+            except Exception as e:
+                print("[ERROR]: failed to stop JVM due to {0}".format(str(e)))
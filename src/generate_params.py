@@ -3,28 +3,34 @@ import sys
 import json
 import random
 import subprocess
-import itertools 
 import numpy as np
 import pandas as pd
 
 from cadet.perf import Perf
-from cadet.config_params import ConfigParams 
+from cadet.config_params import ConfigApplier, order_configs
 from cadet.Configuration import Config as cfg
 from cadet.compute_performance import ComputePerformance
+from cadet.measurement_daemon import MeasurementDaemon
+from cadet.results_writer import ResultsWriter
+from cadet.repetitions import AdaptiveRepetition
+from cadet.settle import SettleDetector
+from cadet.config_space import ConfigSpace
+from cadet.active_sampler import ActiveSampler
+from cadet.workload import WORKLOADS
 
 random.seed(288)
 
 class GenerateParams(object):
     """This class is used to generate parameters for running inference
     """
-    def __init__(self,  software):
+    def __init__(self,  software, run=True):
         print("[STATUS]: Initializing GenerateParams Class")
         self.perf_obj = Perf()       
        
         # constants
         self.ENABLE = "1"
         self.DISABLE = "0"
-        self.NUM_TEST = 2
+        self.OBJECTIVES = ["inference_time", "total_energy_consumption"]
                 
         # determine current system
         self.sys_name = self.get_sys_name()
@@ -33,12 +39,16 @@ class GenerateParams(object):
         self.file_name_output = self.output_file + str(software) + ".csv"
         print (self.file_name_output)
         # columns of dataframe
-        self.columns =  cfg.hardware_columns[self.sys_name]
-        self.columns.extend (cfg.software_columns[self.software])
+        # copy, the config list must not grow with the extends below
+        self.columns =  list(cfg.hardware_columns[self.sys_name])
+        # software options are declared by the workload
+        self.software_columns = WORKLOADS[self.software].get_option_columns()
+        self.columns.extend (self.software_columns)
         self.columns.extend (cfg.measurement_columns)
-        # run     
-        self.initialize()
-        self.run_experiment() 
+        # run, without it only the configuration space is available
+        if run:
+            self.initialize()
+            self.run_experiment() 
                 
     def initialize(self):
         # get list of big cores 
@@ -56,7 +66,7 @@ class GenerateParams(object):
         except:
             # get big core frequencies 
             self.big_core_freqs = self.get_big_core_freqs()
-            self.big_core_freqs = filter(None, self.big_core_freqs)
+            self.big_core_freqs = list(filter(None, self.big_core_freqs))
         
             # get gpu frequencies
             self.gpu_freqs = self.get_gpu_freqs()
@@ -72,34 +82,141 @@ class GenerateParams(object):
                
     def run_experiment(self):
         """This function is used to run experiments"""
-        # set config   
-        for conf in range(0, len(self.params)):                             
-            cur_conf = self.params[conf]
-            cur_conf_name = "{0}{1}".format("Config",conf)        
-            ConfigParams(cur_conf, self.sys_name, self.big_cores, 
-                         self.columns)
-            for iteration in range(self.NUM_TEST):
-                    os.system('perf stat -e cycles,instructions,context-switches,cache-references,cache-misses,L1-dcache-loads,L1-dcache-load-misses,L1-dcache-stores,migrations,minor-faults,major-faults,branch-loads,branch-load-misses,emulation-faults,alignment-faults,branch-misses,raw_syscalls:sys_enter,raw_syscalls:sys_exit,block:*,sched:*,irq:*,ext4:* -o cur python3 /home/nvidia/CADET/cadet/compute_performance.py')
-                    perf_output = self.perf_obj.parse_perf()    
-                    with open ('measurement','r') as f:
-                        data = json.load(f)
-                    cur = list(cur_conf[:])
-                    cur.append(data['cur_inference'])
-                    cur.append(data['cur_total_power'])
-                    cur.append(data['cur_gpu_power'])
-                    cur.append(data['cur_cpu_power'])
-                    cur.append(data['cur_total_temp'])
-                    cur.append(data['cur_gpu_temp'])
-                    cur.append(data['cur_cpu_temp'])
-                    self.df = pd.DataFrame(np.array(cur).reshape(1, len(self.columns)))
-                    self.df.columns = self.columns[:]
-                    self.df = self.df.join(perf_output)
-                    if not os.path.isfile(self.file_name_output):
-                        self.df.to_csv(self.file_name_output)
-                    else:
-                        self.df.to_csv(self.file_name_output, header = False, mode="a")
+        # measurements are taken in process, perf attaches to the workload server 
+        workload_pid = MeasurementDaemon.get_workload_pid(cfg.workload_pid_file)
+        inference = cfg.inference
+        self.daemon = MeasurementDaemon(self.sys_name, workload_pid,
+                                        url=inference["url"],
+                                        socket_path=inference["socket"],
+                                        warm_up=inference["warm_up"],
+                                        num_requests=inference["requests"],
+                                        timeout=inference["timeout"],
+                                        retries=inference["retries"])
+        # measurements are buffered in a crash safe log, completed 
+        # configurations are skipped when an interrupted sweep is resumed
+        log_file = os.path.splitext(self.file_name_output)[0] + ".jsonl"
+        writer = ResultsWriter(log_file)
+        completed = writer.completed()
+        # a configuration is repeated until the objectives are stable
+        reps = cfg.repetitions
+        self.repetition = AdaptiveRepetition(self.OBJECTIVES, reps["rel_width"],
+                                             reps["confidence"],
+                                             reps["min_repetitions"],
+                                             reps["max_repetitions"])
+        # only the knobs that change between consecutive configurations are 
+        # written, the sweep is ordered to keep those changes few and cheap
+        applier = ConfigApplier(self.sys_name, self.big_cores, self.columns)
+        self.weights = {"core_freq": 3, "gpu_freq": 3, "emc_freq": 3,
+                        "core1_status": 2, "core2_status": 2, "core3_status": 2}
+        # measurement starts once clocks and temperatures are stable
+        settle = cfg.settle
+        self.settle = SettleDetector.from_config(cfg.systems[self.sys_name],
+                                                 rate=settle["rate"],
+                                                 window=settle["window"],
+                                                 freq_tol=settle["freq_tol"],
+                                                 temp_tol=settle["temp_tol"],
+                                                 timeout=settle["timeout"])
+        if cfg.sampling["method"] == "active":
+            self.run_active(applier, writer)
+        else:
+            # set config   
+            order = order_configs(self.params, self.columns, self.weights)
+            for conf in order:                             
+                if conf in completed:
+                    continue
+                self.measure_config(conf, self.params[conf], applier, writer)
+        writer.close()
+        self.settle.close()
+        writer.to_csv(self.file_name_output)
             
                                                                                   
+    def measure_config(self, conf, cur_conf, applier, writer):
+        """This function is used to apply and measure one configuration
+        Returns
+        -------
+            rows: list of dicts, one per run
+        """
+        cur_conf_name = "{0}{1}".format("Config",conf)        
+        settle_time, settled = 0.0, True
+        if applier.apply(cur_conf):
+            settle_time, settled = self.settle.wait()
+        self.repetition.reset()
+        rows = []
+        iteration = 0
+        # software options are applied by the workload server
+        n_hw = len(cfg.hardware_columns[self.sys_name])
+        options = dict(zip(self.software_columns,
+                           cur_conf[n_hw:n_hw + len(self.software_columns)]))
+        while not self.repetition.done():
+            data = self.daemon.measure(options)
+            perf_output = data['perf']
+            cur = list(cur_conf[:])
+            cur.append(data['cur_inference'])
+            cur.append(data['cur_total_power'])
+            cur.append(data['cur_gpu_power'])
+            cur.append(data['cur_cpu_power'])
+            cur.append(data['cur_total_temp'])
+            cur.append(data['cur_gpu_temp'])
+            cur.append(data['cur_cpu_temp'])
+            row = dict(zip(self.columns, cur))
+            row.update(perf_output.iloc[0].to_dict())
+            for key in ("latency_p50", "latency_p95", "latency_p99", "throughput"):
+                row[key] = data["cur_" + key]
+            # energy integrals in mJ, the energy columns keep the Data/ scale
+            for key in ("total", "gpu", "cpu"):
+                row[key + "_energy_mj"] = data["cur_{0}_energy".format(key)]
+            row['iteration'] = iteration
+            row['settle_time'] = settle_time
+            row['settled'] = settled
+            rows.append(row)
+            self.repetition.update(row)
+            iteration += 1
+        # repetition statistics are recorded with every run of the configuration
+        rep_stats = self.repetition.get_stats()
+        if not rep_stats["converged"]:
+            print("[WARNING]: {0} did not converge after {1} runs".format(
+                  cur_conf_name, rep_stats["repetitions"]))
+        for row in rows:
+            row.update(rep_stats)
+            writer.append(conf, row)
+        writer.commit(conf)
+        return rows
+
+    def run_active(self, applier, writer):
+        """This function is used to measure the configurations chosen by a 
+        surrogate model until its error stops improving"""
+        sampling = cfg.sampling
+        config_columns = self.columns[:len(self.columns) - len(cfg.measurement_columns)]
+        sampler = ActiveSampler(self.get_config_space(), config_columns,
+                                self.OBJECTIVES, sampling["batch_size"],
+                                sampling["initial_size"], sampling["acquisition"],
+                                patience=sampling["patience"], tol=sampling["tol"],
+                                max_samples=sampling["num_samples"],
+                                seed=sampling["seed"])
+        # rows of an interrupted sweep are reused
+        df = writer.to_dataframe()
+        self.params = []
+        measured = set()
+        if len(df):
+            measured = set(map(tuple, df[config_columns].drop_duplicates().values.tolist()))
+            sampler.fit(df)
+        conf = int(df["config_id"].max()) + 1 if len(df) else 0
+        while not sampler.done(len(measured)):
+            batch = sampler.next_batch(measured)
+            if not batch:
+                break
+            rows = []
+            for i in order_configs(batch, self.columns, self.weights):
+                rows.extend(self.measure_config(conf, batch[i], applier, writer))
+                self.params.append(batch[i])
+                measured.add(tuple(batch[i]))
+                conf += 1
+            writer.flush()
+            batch_df = pd.DataFrame(rows)
+            df = pd.concat([df, batch_df], ignore_index=True)
+            sampler.update(df, batch_df)
+        self.save_sampled_params()
+
     def random_config_select(self):
         """This function is to select 1600 configurations randomly"""
         from random import randint
@@ -166,30 +283,21 @@ class GenerateParams(object):
             print("[ERROR]: emc frequency file does not exist")
     
     def get_software_config_options(self):
-        """This function is used to generate software config options"""
-        if self.software == "Image": 
-            # memory growth, clear session
-            software_var = [(-1, 0.5, 0.9)] 
-        elif self.software == "NLP": 
-            # memory growth, clear session
-            software_var = [(-1, 0.5, 0.9)] 
-        elif self.software == "Speech": 
-            # memory growth, clear session
-            software_var = [(-1, 0.5, 0.9)] 
-        elif self.software == "x264": 
-            # preset, bit rate, filter
-            software_var =[(),(),()] 
-        elif self.software == "SQLite": 
-            # journal, synchronous, cache size, page size
-            software_var = [(),(),()] 
-        else: 
+        """This function is used to generate software config options, declared by
+        the workload of the software system
+        Returns
+        -------
+            software_var: list of option domains"""
+        if self.software not in WORKLOADS: 
             print ("[ERROR]: software system not supported") 
             return
-        software_var = list(itertools.product(*software_var)) 
-        return software_var  
+        return WORKLOADS[self.software].get_option_values()
     
     def get_os_config_options(self):
-        """This function is used to get os config options"""
+        """This function is used to get os config options
+        Returns
+        -------
+            var: list of option domains"""
          # OS configs 
         cache_pressure = (0, 100, 500)
         swappiness = (10, 60, 100)
@@ -202,11 +310,31 @@ class GenerateParams(object):
         var = [cache_pressure, swappiness, dirty_bg_ratio,
                dirty_ratio, drop_caches, sched_child_runs_first, 
                sched_rt_runtime, policy]
-        os_var = list(itertools.product(*var))
-        return os_var 
+        return var 
     
+    def get_option_domains(self):
+        """This function is used to get the candidate values of every hardware and os
+        option, keyed by the column names used in Data/
+        Returns
+        -------
+            domains: dict mapping options to sorted candidate values
+        """
+        self.load_freqs()
+        space = ConfigSpace(self.get_hardware_config_options() +
+                            self.get_os_config_options())
+        values = space.get_domains()
+        domains = {}
+        for name, vals in zip(cfg.hardware_columns[self.sys_name], values):
+            name = cfg.option_columns.get(name, name)
+            domains[name] = sorted(set(float(v) for v in vals))
+        return domains
+
     def get_hardware_config_options(self):
-        """This function is used to get hardware configuration options"""
+        """This function is used to get hardware configuration options
+        Returns
+        -------
+            var: list of option domains, the core status is one option filling the
+                 four status columns"""
         # cpu frequency
         core_freq = self.big_core_freqs
         # gpu frequency 
@@ -222,36 +350,36 @@ class GenerateParams(object):
                      (self.ENABLE, self.ENABLE, self.DISABLE, self.ENABLE),
                      (self.ENABLE, self.ENABLE, self.ENABLE, self.DISABLE),
                      (self.ENABLE, self.ENABLE, self.ENABLE, self.ENABLE)]
-        var = [core_freq, gpu_freq, emc_freq]
-        hw_var = list(itertools.product(*var))
-        hw_var = list(itertools.product(status_var, hw_var))      
-        for i in range(len(hw_var)):
-            hw_var[i] = hw_var[i][0] + hw_var[i][1]
-        hw_var = list(hw_var for hw_var,_ in itertools.groupby(hw_var))
-        return hw_var 
+        var = [status_var, core_freq, gpu_freq, emc_freq]
+        return var 
     
-    def generate_params_combination(self):
-        """This function is used to generate parameter combination using hardware, 
+    def load_freqs(self):
+        """This function is used to read the available frequencies once"""
+        if not hasattr(self, "gpu_freqs"):
+            self.big_core_freqs = list(filter(None, self.get_big_core_freqs()))
+            self.gpu_freqs = self.freq_conversion(self.get_gpu_freqs())
+            self.emc_freqs = self.freq_conversion(self.get_emc_freqs())
+
+    def get_config_space(self):
+        """This function is used to get the configuration space of the hardware, 
         os and software system configuration options"""
-        # hardware configs
-        hw_var = self.get_hardware_config_options()
-        # os configs
-        os_var = self.get_os_config_options()
-        # software configs
-        soft_var = self.get_software_config_options()
-        # os-software-configs
-        os_soft_var = list(itertools.product(os_var, soft_var)) 
-            
-        for i in range(len(os_soft_var)):
-            os_soft_var[i] = os_soft_var[i][0] + os_soft_var[i][1]
-        os_soft_var = list(os_soft_var for os_soft_var,_ in itertools.groupby(os_soft_var))
-        # select 1600 samples
-        hw_sampled_var = random.sample(hw_var, 1600)
-        os_soft_sampled_var = random.sample(os_soft_var, 1600)
-        # sampled_params
-        self.params = []
-        for i in range(1600):
-            self.params.append(hw_sampled_var[i] + os_soft_var[i])
+        self.load_freqs()
+        return ConfigSpace(self.get_hardware_config_options() +
+                           self.get_os_config_options() +
+                           self.get_software_config_options())
+
+    def generate_params_combination(self):
+        """This function is used to sample configurations of the hardware, os and
+        software system configuration options, configurations are decoded from 
+        their index in the configuration space instead of enumerating it"""
+        sampling = cfg.sampling
+        if sampling["method"] == "active":
+            # configurations are chosen while measuring, see run_active
+            self.params = []
+            return
+        space = self.get_config_space()
+        self.params = list(space.stream(sampling["num_samples"], sampling["method"],
+                                        sampling["seed"]))
                 
     def save_sampled_params(self):
         """This function is used to extract the valid params from all the combination of params"""       
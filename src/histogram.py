@@ -0,0 +1,32 @@
+import threading
+import numpy as np
+
+class Histogram(object):
+    """This class is used to record a distribution in fixed log spaced buckets. The
+    workload server observes from its request threads, observations and exports are
+    serialized by a lock."""
+    def __init__(self, name, buckets):
+        self.name = name
+        self.buckets = np.asarray(buckets, dtype=np.float64)
+        self.counts = np.zeros(len(self.buckets) + 1, dtype=np.int64)
+        self.total = 0.0
+        self.lock = threading.Lock()
+
+    def observe(self, value):
+        with self.lock:
+            self.counts[np.searchsorted(self.buckets, value)] += 1
+            self.total += value
+
+    def to_prometheus(self):
+        """This function is used to format the histogram in the prometheus text
+        format, bucket counts are cumulative"""
+        with self.lock:
+            counts = np.cumsum(self.counts)
+            total = self.total
+        lines = ["# TYPE {0} histogram".format(self.name)]
+        for bound, count in zip(self.buckets, counts):
+            lines.append('{0}_bucket{{le="{1:g}"}} {2}'.format(self.name, bound, count))
+        lines.append('{0}_bucket{{le="+Inf"}} {1}'.format(self.name, counts[-1]))
+        lines.append("{0}_sum {1}".format(self.name, total))
+        lines.append("{0}_count {1}".format(self.name, counts[-1]))
+        return "\n".join(lines)
@@ -0,0 +1,146 @@
+import json
+import time
+import socket
+import http.client
+import numpy as np
+from urllib.parse import urlparse
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """This class is used to talk http over a unix domain socket"""
+    def __init__(self, socket_path, timeout=None):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if self.timeout is not None:
+            self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+class InferenceClient(object):
+    """This class is used to send inference requests to the workload server over one
+    persistent connection. The connection is opened before the timed requests, so
+    connection setup is not part of the latencies, and failed requests are retried
+    on a fresh connection.
+    """
+    def __init__(self, url='http://localhost:5000/api', socket_path=None,
+                 timeout=60.0, retries=3, backoff=0.5):
+        """
+        Parameters
+        ----------
+            url: url of the inference endpoint
+            socket_path: unix domain socket of the server, used instead of tcp
+            timeout: seconds to wait for a response
+            retries: attempts after the first failed one
+            backoff: seconds to wait before the first retry, doubled every retry
+        """
+        print("[STATUS]: Initializing InferenceClient Class")
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 80
+        self.path = parsed.path or "/"
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.conn = None
+
+    def connect(self):
+        if self.conn is None:
+            if self.socket_path:
+                self.conn = UnixHTTPConnection(self.socket_path, self.timeout)
+            else:
+                self.conn = http.client.HTTPConnection(self.host, self.port,
+                                                       timeout=self.timeout)
+            self.conn.connect()
+            if not self.socket_path:
+                # headers and body go out as separate writes, without nodelay the
+                # body waits for the delayed ack of the headers
+                self.conn.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return self.conn
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def post(self, payload):
+        """This function is used to send one request
+        Returns
+        -------
+            response: decoded json response
+            latency: seconds from sending the request to reading the response
+        """
+        body = json.dumps(payload).encode()
+        headers = {"Content-Type": "application/json", "Connection": "keep-alive"}
+        for attempt in range(self.retries + 1):
+            try:
+                conn = self.connect()
+                start = time.perf_counter()
+                conn.request("POST", self.path, body, headers)
+                resp = conn.getresponse()
+                data = resp.read()
+                latency = time.perf_counter() - start
+                if resp.status != 200:
+                    raise http.client.HTTPException("status {0}".format(resp.status))
+                break
+            except (OSError, http.client.HTTPException) as e:
+                self.close()
+                if attempt == self.retries:
+                    raise
+                print("[WARNING]: inference request failed ({0}), retrying".format(e))
+                time.sleep(self.backoff * 2 ** attempt)
+        if resp.will_close:
+            # the next request gets a connection opened outside its timing
+            self.close()
+            try:
+                self.connect()
+            except OSError:
+                self.close()
+        response = json.loads(data)
+        # the server returns the json document as a json string
+        if isinstance(response, str):
+            response = json.loads(response)
+        return response, latency
+
+    def warm_up(self, num_requests=1, payload=None):
+        """This function is used to send untimed requests, e.g. before the energy
+        sampling starts"""
+        for _ in range(num_requests):
+            self.post(payload or {'connect':'yes',})
+
+    def run(self, num_requests=1, payload=None):
+        """This function is used to send timed requests
+        Returns
+        -------
+            result: dict with the client latencies, the server side times and
+                    throughputs and the latency percentiles p50/p95/p99 in seconds
+        """
+        try:
+            # connection setup is kept out of the first latency
+            self.connect()
+        except OSError:
+            # post retries the connection
+            self.close()
+        latencies = np.empty(num_requests)
+        server_times = np.empty(num_requests)
+        throughputs = np.empty(num_requests)
+        for i in range(num_requests):
+            response, latencies[i] = self.post(payload or {'connect':'yes',})
+            server_times[i] = response.get("time", np.nan)
+            throughputs[i] = response.get("throughput", np.nan)
+        result = {"latencies": latencies, "server_times": server_times,
+                  "throughputs": throughputs}
+        result.update(self.percentiles(latencies))
+        return result
+
+    @staticmethod
+    def percentiles(latencies):
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        return {"p50": float(p50), "p95": float(p95), "p99": float(p99)}
@@ -0,0 +1,142 @@
+import time
+import traceback
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+
+COLUMNS = ["core_freq", "gpu_freq", "emc_freq",
+           "inference_time", "total_energy_consumption",
+           "scheduler.policy", "vm.swappiness", "cpu_utilization",
+           "migrations", "context-switches", "cache-misses",
+           "cache-references", "branch-misses", "branch-load-misses",
+           "vm.vfs_cache_pressure", "vm.dirty_background_ratio"]
+
+CONF_OPT = ["core_freq", "gpu_freq", "emc_freq",
+            "scheduler.policy", "vm.swappiness", "vm.vfs_cache_pressure",
+            "vm.dirty_background_ratio"]
+
+OBJECTIVES = ["total_energy_consumption", "inference_time"]
+
+def run_target(hardware, software, mode,
+               objectives, batch=True, init_data=None,
+               config_file="./etc/config.yml", replay=False):
+    """This function is used to learn the causal model of one (hardware, software,
+    mode) target and resolve its bugs. The repairs are measured on the device, with
+    replay they are measured from Data/GroundTruth instead
+    Returns
+    -------
+        results: dataframe with one record per bug
+    """
+    from cadet.utils.config_parser import Config
+    from cadet.causal_model import CausalModel
+    from cadet.dataset import Dataset
+    from cadet.structure_cache import StructureCache
+    from cadet.debugger import Debugger
+    from cadet.replay import ReplayMeasurement
+    cfg = Config(config_file).load_config()
+    dataset = Dataset(cfg.data_dir, cfg.cache_dir)
+    columns = COLUMNS[:]
+    if init_data:
+        df = dataset.read_csv(init_data, columns)
+    else:
+        df = dataset.load("Initial", mode, hardware, software, columns)
+    # candidate values of the options are the values observed in the data, on the
+    # device every value of the configuration space can be measured
+    domains = {opt: sorted(df[opt].dropna().unique()) for opt in CONF_OPT}
+    if not replay:
+        from cadet.generate_params import GenerateParams
+        space = GenerateParams(software, run=False).get_option_domains()
+        domains.update({opt: space[opt] for opt in CONF_OPT if opt in space})
+    # initialize causal model object
+    CM = CausalModel(fci_backend=cfg.fci_backend, fci_jobs=cfg.fci_jobs,
+                     path_effect_jobs=cfg.path_effect_jobs,
+                     notears_refit_tol=cfg.notears_refit_tol)
+    cache = StructureCache(cfg.structure_cache.dir,
+                           cfg.structure_cache.max_entries)
+    # edge constraints
+    tabu_edges = CM.get_tabu_edges(columns, CONF_OPT, OBJECTIVES)
+    # Get Bug and update df
+    bugs = dataset.load("Bug", mode, hardware, software, columns)
+    if replay:
+        measure = ReplayMeasurement.from_dataset(dataset, mode, hardware, software,
+                                                 columns, CONF_OPT)
+    else:
+        from cadet.device_measurement import DeviceMeasurement
+        measure = DeviceMeasurement.from_config(hardware)
+    debugger = Debugger(CM, df, columns, tabu_edges, objectives, domains,
+                        cfg.query, cfg.num_paths, cfg.max_path_length, cache,
+                        measure, incremental=cfg.notears_incremental,
+                        top_k=cfg.path_top_k, weighted_paths=cfg.weighted_paths)
+    if batch:
+        # one shared model for all the bugs
+        results = debugger.run(bugs)
+    else:
+        results = []
+        for i in range(len(bugs)):
+            debugger.df = df
+            results.append(debugger.run(bugs.iloc[[i]]))
+        results = pd.concat(results, ignore_index=True)
+    if not replay:
+        measure.close()
+    results.insert(0, "mode", mode)
+    results.insert(0, "software", software)
+    results.insert(0, "hardware", hardware)
+    return results
+
+def limit_memory(memory_limit_mb):
+    """This function is used to cap the address space of a worker process"""
+    if memory_limit_mb:
+        import resource
+        limit = int(memory_limit_mb) * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+def _run_target(args):
+    target, objectives, batch, config_file, replay = args
+    hardware, software, mode = target
+    start = time.time()
+    try:
+        results = run_target(hardware, software, mode, objectives, batch,
+                             config_file=config_file, replay=replay)
+        error = None
+    except MemoryError:
+        results, error = None, "memory limit exceeded"
+    except Exception:
+        results, error = None, traceback.format_exc()
+    return target, results, error, time.time() - start
+
+def run_matrix(targets, objectives, max_workers=None,
+               memory_limit_mb=None, batch=True,
+               config_file="./etc/config.yml", replay=False):
+    """This function is used to run a matrix of targets, one target per worker
+    process of a bounded pool
+    Parameters
+    ----------
+        targets: list of (hardware, software, mode)
+        max_workers: size of the pool, the number of cores by default
+        memory_limit_mb: address space limit of every worker
+    Returns
+    -------
+        summary: dataframe with one row per target
+        results: dataframe with the records of all the bugs
+    """
+    args = [(tuple(target), objectives, batch, config_file, replay)
+            for target in targets]
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=limit_memory,
+                             initargs=(memory_limit_mb,)) as pool:
+        outputs = list(pool.map(_run_target, args))
+    summary = []
+    results = []
+    for (hardware, software, mode), res, error, duration in outputs:
+        row = {"hardware": hardware, "software": software, "mode": mode,
+               "bugs": 0, "fixed": 0, "recommended": 0,
+               "time": duration, "error": error}
+        if res is not None:
+            row["bugs"] = len(res)
+            row["fixed"] = int((res["status"] == "fixed").sum())
+            row["recommended"] = int((res["status"] == "recommended").sum())
+            results.append(res)
+        else:
+            print("[ERROR]: target {0}/{1}/{2} failed: {3}".format(hardware, software,
+                                                                   mode, error))
+        summary.append(row)
+    results = pd.concat(results, ignore_index=True) if results else pd.DataFrame()
+    return pd.DataFrame(summary), results
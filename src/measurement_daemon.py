@@ -0,0 +1,210 @@
+import os
+import json
+import time
+import signal
+import subprocess
+import numpy as np
+import pandas as pd
+from multiprocessing import Process, Pipe
+
+from cadet.perf import Perf
+from cadet.sampler import SysfsSampler
+from cadet.inference_client import InferenceClient
+from cadet.Configuration import Config as cfg
+
+class MeasurementDaemon(object):
+    """This class is used to measure configurations from one long-lived process.
+    The sensor sampler, the http session and the imports stay warm between runs and
+    perf is attached to the already running workload server instead of starting a
+    new interpreter under perf for every run.
+    """
+    def __init__(self, sys_name, workload_pid,
+                 url='http://localhost:5000/api',
+                 events=Perf.EVENTS, perf_output="cur",
+                 interval_ms=None, socket_path=None,
+                 warm_up=1, num_requests=1,
+                 timeout=60.0, retries=3,
+                 sampler=None, client=None):
+        """
+        Parameters
+        ----------
+            events: perf events counted on the workload, no perf without events
+            sampler: SysfsSampler of the power and temperature channels, the 
+                     nodes of the system by default
+            client: InferenceClient, a client of url by default
+        """
+        print("[STATUS]: Initializing MeasurementDaemon Class")
+        self.sys_name = sys_name
+        self.workload_pid = workload_pid
+        self.url = url
+        self.events = events
+        self.perf_output = perf_output
+        # with interval_ms perf also gives per interval counter time series
+        self.interval_ms = interval_ms
+        self.perf_obj = Perf()
+        self.sampler = sampler or SysfsSampler.from_config(cfg.systems[self.sys_name])
+        # one persistent connection for all the measurements
+        self.client = client or InferenceClient(self.url, socket_path, timeout, retries)
+        self.warm_up = warm_up
+        self.num_requests = num_requests
+
+    @staticmethod
+    def get_workload_pid(pid_file):
+        """This function is used to read the pid written by the workload server"""
+        with open(pid_file, "r") as f:
+            return int(f.read().strip())
+
+    def start_perf(self):
+        """This function is used to attach perf stat to the workload process, it
+        returns once the counters are open so the timed requests are counted"""
+        cmd = Perf.stat_command(self.events, self.workload_pid, self.perf_output,
+                                self.interval_ms)
+        proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL,
+                                stderr=subprocess.DEVNULL)
+        self.wait_perf(proc)
+        return proc
+
+    @staticmethod
+    def count_perf_events(pid):
+        """This function is used to count the perf_event file descriptors of a
+        process"""
+        fd_dir = "/proc/{0}/fd".format(pid)
+        count = 0
+        try:
+            fds = os.listdir(fd_dir)
+        except OSError:
+            return 0
+        for fd in fds:
+            try:
+                if os.readlink(os.path.join(fd_dir, fd)) == "anon_inode:[perf_event]":
+                    count += 1
+            except OSError:
+                continue
+        return count
+
+    def wait_perf(self, proc, timeout=5.0, poll=0.01):
+        """This function is used to wait until perf attached to the workload. perf
+        opens one perf_event descriptor per event and cpu and enables them once all
+        are open, it is ready when their number stopped growing."""
+        deadline = time.monotonic() + timeout
+        last = 0
+        while time.monotonic() < deadline:
+            if proc.poll() is not None:
+                raise RuntimeError("[ERROR]: perf stat exited with status {0}".format(
+                                   proc.returncode))
+            count = self.count_perf_events(proc.pid)
+            if count and count == last:
+                return True
+            last = count
+            time.sleep(poll)
+        print("[WARNING]: perf stat did not attach within {0}s".format(timeout))
+        return False
+
+    def stop_perf(self, proc):
+        """This function is used to detach perf, perf writes its counts on SIGINT
+        Returns
+        -------
+            counts: one row dataframe of the counts of the run
+            intervals: dataframe of the counts per interval, None without interval_ms
+        """
+        if proc is None:
+            return pd.DataFrame([{}]), None
+        proc.send_signal(signal.SIGINT)
+        proc.wait()
+        if not self.interval_ms:
+            return self.perf_obj.parse_perf_csv(self.perf_output), None
+        intervals = self.perf_obj.parse_perf_intervals(self.perf_output)
+        counts = intervals.sum(min_count=1).to_frame().T
+        return counts, intervals
+
+    def compute_inference_time(self, payload=None):
+        """This function is used to time the requests of one measurement
+        Returns
+        -------
+            inference_time: mean server side time of the requests
+            latency: client latency percentiles and server side throughputs
+        """
+        result = self.client.run(self.num_requests, payload)
+        return float(np.nanmean(result["server_times"])), result
+
+    def measure(self, options=None):
+        """This function is used to measure the current configuration once
+        Parameters
+        ----------
+            options: software options of the configuration, applied by the 
+                     workload server
+        Returns
+        -------
+            data: dict with the measurement keys of ComputePerformance, "perf",
+                  a one row dataframe of the perf counters and "perf_intervals",
+                  the counters per interval with interval_ms
+        """
+        payload = {'connect':'yes', 'options':options or {}}
+        # warm up requests are neither counted nor sampled
+        self.client.warm_up(self.warm_up, payload)
+        proc = self.start_perf() if self.events else None
+        self.sampler.start()
+        try:
+            inference_time, latency = self.compute_inference_time(payload)
+        finally:
+            self.sampler.stop()
+            perf_output, perf_intervals = self.stop_perf(proc)
+        channels = self.sampler.names
+        def energy(name):
+            return self.sampler.energy(name) if name in channels else 0
+        def energy_sum(name):
+            return self.sampler.energy_sum(name) if name in channels else 0
+        def temp(name):
+            return self.sampler.mean(name) if name in channels else 0
+        return {'cur_total_power' : int(energy_sum("total_power")),
+                'cur_gpu_power' :  int(energy_sum("gpu_power")),
+                'cur_cpu_power' : int(energy_sum("cpu_power")),
+                'cur_total_energy' : energy("total_power"),
+                'cur_gpu_energy' : energy("gpu_power"),
+                'cur_cpu_energy' : energy("cpu_power"),
+                'cur_inference' : float(inference_time),
+                'cur_total_temp' : float(temp("total_temperature")),
+                'cur_gpu_temp' : float(temp("gpu_temperature")),
+                'cur_cpu_temp' : float(temp("cpu_temperature")),
+                'cur_latency_p50' : latency["p50"],
+                'cur_latency_p95' : latency["p95"],
+                'cur_latency_p99' : latency["p99"],
+                'cur_throughput' : float(np.nanmean(latency["throughputs"])),
+                'perf' : perf_output,
+                'perf_intervals' : perf_intervals}
+
+    def serve(self, conn):
+        """This function is used to answer measurement requests sent over a pipe, a
+        request is "measure" or ("measure", options) with the software options"""
+        while True:
+            msg = conn.recv()
+            options = None
+            if isinstance(msg, tuple):
+                msg, options = msg
+            if msg == "measure":
+                conn.send(self.measure(options))
+            elif msg == "stop":
+                break
+        self.close()
+
+    def close(self):
+        self.sampler.close()
+        self.client.close()
+
+    @classmethod
+    def spawn(cls, sys_name, workload_pid, **kwargs):
+        """This function is used to run the daemon in its own process
+        Returns
+        -------
+            process: the daemon process
+            conn: pipe end, send "measure" or ("measure", options) to get a 
+                  measurement and "stop" to exit
+        """
+        parent, child = Pipe()
+        process = Process(target=_serve, args=(child, sys_name, workload_pid, kwargs),
+                          daemon=True)
+        process.start()
+        return process, parent
+
+def _serve(conn, sys_name, workload_pid, kwargs):
+    MeasurementDaemon(sys_name, workload_pid, **kwargs).serve(conn)
@@ -0,0 +1,159 @@
+import numpy as np
+import scipy.linalg as slin
+import scipy.optimize as sopt
+
+class IncrementalNotears(object):
+    """This class is used to learn a linear NOTEARS model from sufficient statistics.
+    The covariance of the data is updated in O(d^2) per appended row and the
+    augmented Lagrangian solver is warm-started from the previous weight matrix.
+    """
+    def __init__(self, columns, tabu_edges=None,
+                 lambda1=0.1, max_iter=100, h_tol=1e-8,
+                 rho_max=1e16, standardize=True):
+        print("[STATUS]: Initializing IncrementalNotears Class")
+        self.columns = list(columns)
+        self.d = len(self.columns)
+        self.lambda1 = lambda1
+        self.max_iter = max_iter
+        self.h_tol = h_tol
+        self.rho_max = rho_max
+        self.standardize = standardize
+        self.tabu_edges = set(tuple(edge) for edge in (tabu_edges or []))
+        self.bounds = self.get_bounds()
+        self.reset()
+
+    def reset(self):
+        """This function is used to drop the statistics and the solver state"""
+        self.n = 0
+        self.mean = np.zeros(self.d)
+        self.m2 = np.zeros((self.d, self.d))
+        self.w_est = None
+        self.rho = 1.0
+        self.alpha = 0.0
+        self.W = None
+
+    def get_bounds(self):
+        """This function is used to pin self loops and tabu edges to zero"""
+        index = {col: i for i, col in enumerate(self.columns)}
+        blocked = set((i, i) for i in range(self.d))
+        for u, v in self.tabu_edges:
+            if u in index and v in index:
+                blocked.add((index[u], index[v]))
+        bounds = [(0, 0) if (i, j) in blocked else (0, None)
+                  for _ in range(2) for i in range(self.d) for j in range(self.d)]
+        return bounds
+
+    def partial_fit(self, X):
+        """This function is used to update the sufficient statistics with new rows
+        Parameters
+        ----------
+            X: array of shape (rows, d)
+        """
+        X = np.atleast_2d(np.asarray(X, dtype=np.float64))
+        for x in X:
+            self.n += 1
+            delta = x - self.mean
+            self.mean += delta / self.n
+            self.m2 += np.outer(delta, x - self.mean)
+        return self
+
+    def covariance(self):
+        """This function is used to compute the (optionally standardized) covariance"""
+        cov = self.m2 / max(self.n, 1)
+        if self.standardize:
+            std = np.sqrt(np.diag(cov))
+            std[std == 0] = 1.0
+            cov = cov / np.outer(std, std)
+        return cov
+
+    def fit(self, warm_start=True):
+        """This function is used to solve NOTEARS on the current statistics
+        Parameters
+        ----------
+            warm_start: start from the previous weight matrix and dual variables
+        Returns
+        -------
+            W: weighted adjacency matrix of shape (d, d)
+        """
+        d = self.d
+        S = self.covariance()
+        I = np.eye(d)
+
+        def _adj(w):
+            return (w[:d * d] - w[d * d:]).reshape([d, d])
+
+        def _loss(W):
+            R = I - W
+            loss = 0.5 * np.trace(R.T @ S @ R)
+            G_loss = -S @ R
+            return loss, G_loss
+
+        def _h(W):
+            E = slin.expm(W * W)
+            h = np.trace(E) - d
+            G_h = E.T * W * 2
+            return h, G_h
+
+        def _func(w):
+            W = _adj(w)
+            loss, G_loss = _loss(W)
+            h, G_h = _h(W)
+            obj = loss + 0.5 * rho * h * h + alpha * h + self.lambda1 * w.sum()
+            G_smooth = G_loss + (rho * h + alpha) * G_h
+            g_obj = np.concatenate((G_smooth + self.lambda1, - G_smooth + self.lambda1),
+                                   axis=None)
+            return obj, g_obj
+
+        if warm_start and self.w_est is not None:
+            w_est, rho, alpha = self.w_est, min(self.rho, 1e4), self.alpha
+        else:
+            w_est, rho, alpha = np.zeros(2 * d * d), 1.0, 0.0
+        h = np.inf
+        for _ in range(self.max_iter):
+            w_new, h_new = None, None
+            while rho < self.rho_max:
+                sol = sopt.minimize(_func, w_est, method="L-BFGS-B", jac=True,
+                                    bounds=self.bounds)
+                w_new = sol.x
+                h_new, _ = _h(_adj(w_new))
+                if h_new > 0.25 * h:
+                    rho *= 10
+                else:
+                    break
+            w_est, h = w_new, h_new
+            alpha += rho * h
+            if h <= self.h_tol or rho >= self.rho_max:
+                break
+        self.w_est, self.rho, self.alpha = w_est, rho, alpha
+        self.W = _adj(w_est)
+        return self.W
+
+    def update(self, X, thres, refit_tol=0.05):
+        """This function is used to add rows and warm-start the solver from the 
+        previous weights. A warm start can stay in the local optimum of the old data,
+        so the model is refitted from scratch when the edge set changed or a weight
+        lies within refit_tol of the threshold, where a different optimum would
+        flip the edge.
+        Returns
+        -------
+            refitted: whether the warm-started solution was replaced by a full fit
+        """
+        edges = set(self.get_edges(thres)) if self.W is not None else None
+        self.partial_fit(X)
+        self.fit(warm_start=True)
+        ambiguous = np.any(np.abs(np.abs(self.W) - thres) < refit_tol)
+        if edges is None or ambiguous or set(self.get_edges(thres)) != edges:
+            self.fit(warm_start=False)
+            return True
+        return False
+
+    def get_edges(self, thres):
+        """This function is used to extract the edges whose weight exceeds a threshold
+        Returns
+        -------
+            edges: list of (cause, effect) tuples
+        """
+        edges = []
+        for i, j in zip(*np.nonzero(np.abs(self.W) >= thres)):
+            edges.append((self.columns[i], self.columns[j]))
+        return edges
@@ -0,0 +1,61 @@
+import numpy as np
+
+def dominates(Y, y):
+    """This function is used to check which rows of Y dominate the point y, all the
+    objectives are minimized"""
+    return np.all(Y <= y, axis=1) & np.any(Y < y, axis=1)
+
+def pareto_front(Y):
+    """This function is used to find the non-dominated rows of Y
+    Parameters
+    ----------
+        Y: array (n, objectives), all the objectives are minimized
+    Returns
+    -------
+        mask: boolean array, True for the rows on the pareto front
+    """
+    Y = np.asarray(Y, dtype=np.float64)
+    # candidates are visited by their sum, a row can only be dominated by rows
+    # with a smaller sum, so dominated rows are dropped early
+    order = np.argsort(Y.sum(axis=1), kind="mergesort")
+    front = []
+    for i in order:
+        if not front or not np.any(dominates(Y[front], Y[i])):
+            front.append(i)
+    mask = np.zeros(len(Y), dtype=bool)
+    mask[front] = True
+    return mask
+
+def pareto_rank(Y):
+    """This function is used to sort the rows of Y into successive fronts
+    Returns
+    -------
+        rank: array, 0 for the pareto front, 1 for the front once it is removed, ...
+    """
+    Y = np.asarray(Y, dtype=np.float64)
+    rank = np.full(len(Y), -1)
+    remaining = np.arange(len(Y))
+    level = 0
+    while len(remaining):
+        mask = pareto_front(Y[remaining])
+        rank[remaining[mask]] = level
+        remaining = remaining[~mask]
+        level += 1
+    return rank
+
+def crowding_distance(Y):
+    """This function is used to measure how isolated every point of a front is, the
+    extreme points of every objective get an infinite distance"""
+    Y = np.asarray(Y, dtype=np.float64)
+    n, m = Y.shape
+    dist = np.zeros(n)
+    if n < 3:
+        dist[:] = np.inf
+        return dist
+    for j in range(m):
+        order = np.argsort(Y[:, j], kind="mergesort")
+        span = Y[order[-1], j] - Y[order[0], j]
+        dist[order[0]] = dist[order[-1]] = np.inf
+        if span > 0:
+            dist[order[1:-1]] += (Y[order[2:], j] - Y[order[:-2], j]) / span
+    return dist
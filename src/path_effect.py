@@ -0,0 +1,70 @@
+import json
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from cadet.structure_cache import fingerprint
+
+def compute_pair_effect(G, df, treatment, outcome):
+    """This function is used to compute the ACE of treatment on outcome with the
+    g-formula"""
+    from ananke.estimation import CausalEffect
+    obj = CausalEffect(graph=G, treatment=treatment, outcome=outcome)
+    return obj.compute_effect(df, "gformula")
+
+def _compute_pair_effect(args):
+    return compute_pair_effect(*args)
+
+class PathEffect(object):
+    """This class is used to compute path average causal effects. The effect of every
+    (treatment, outcome) pair is computed once per graph and data version and shared
+    by all the paths that contain the pair.
+    """
+    def __init__(self, n_jobs=1):
+        print("[STATUS]: Initializing PathEffect Class")
+        self.n_jobs = n_jobs
+        self.version = None
+        self.memo = {}
+
+    def get_version(self, df, G):
+        """This function is used to compute the version of a graph and its data"""
+        desc = {"di_edges": sorted([list(e) for e in G.di_edges]),
+                "bi_edges": sorted([sorted(e) for e in G.bi_edges]),
+                "data": fingerprint(df)}
+        return hashlib.sha1(json.dumps(desc).encode()).hexdigest()
+
+    def pair_effects(self, df, G, pairs):
+        """This function is used to compute the ACE of (treatment, outcome) pairs,
+        pairs already computed for the current version are not recomputed
+        Returns
+        -------
+            effects: dict mapping (treatment, outcome) to ace
+        """
+        version = self.get_version(df, G)
+        if version != self.version:
+            self.version = version
+            self.memo = {}
+        missing = [pair for pair in dict.fromkeys(pairs) if pair not in self.memo]
+        if missing:
+            if self.n_jobs > 1 and len(missing) > 1:
+                with ProcessPoolExecutor(max_workers=self.n_jobs) as pool:
+                    args = [(G, df, t, o) for t, o in missing]
+                    values = list(pool.map(_compute_pair_effect, args))
+            else:
+                values = [compute_pair_effect(G, df, t, o) for t, o in missing]
+            for pair, val in zip(missing, values):
+                print("causal effect of {0} on {1} = {2}".format(pair[0], pair[1], val))
+                self.memo[pair] = val
+        return {pair: self.memo[pair] for pair in pairs}
+
+    def path_effects(self, df, G, paths):
+        """This function is used to compute the P_ACE of each path, the sum of the
+        effects of every node of the path on the objective (first node)
+        Returns
+        -------
+            ace: dict mapping path tuples to P_ACE
+        """
+        pairs = [(path[i], path[0]) for path in paths for i in range(1, len(path))]
+        effects = self.pair_effects(df, G, pairs)
+        ace = {}
+        for path in paths:
+            ace[tuple(path)] = sum(effects[(path[i], path[0])] for i in range(1, len(path)))
+        return ace
@@ -1,17 +1,32 @@
 import os
+import re
 import sys
+import numpy as np
 import pandas as pd 
 
 class Perf:
     """This class is used to perform Perf parsing"""
+    EVENTS = ("cycles,instructions,context-switches,cache-references,cache-misses,"
+              "L1-dcache-loads,L1-dcache-load-misses,L1-dcache-stores,migrations,"
+              "minor-faults,major-faults,branch-loads,branch-load-misses,"
+              "emulation-faults,alignment-faults,branch-misses,raw_syscalls:sys_enter,"
+              "raw_syscalls:sys_exit,block:*,sched:*,irq:*,ext4:*")
+
+    # names perf prints for aliased events
+    ALIASES = {"cpu-migrations": "migrations",
+               "cs": "context-switches",
+               "faults": "page-faults"}
+    # event modifiers, e.g. cycles:u
+    MODIFIERS = re.compile(r":[ukhIGHpPSDW]+$")
+
     def __init__(self):
         print ('[STATUS]: Initializing Perf Class')
         self.VALUE=0
         self.EVENT=1
         
-    def parse_perf(self):
+    def parse_perf(self, filename='cur'):
         output=list()
-        with open ('cur','r') as f:
+        with open (filename,'r') as f:
             for line in f:
                 output.append(line.split(' '))
         output=output[5:]
@@ -28,3 +43,98 @@ class Perf:
             if len(line) > 2:
                 perf_output[line[self.EVENT]]=[line[self.VALUE]]         
         return pd.DataFrame(perf_output)
+
+    @staticmethod
+    def stat_command(events, pid=None, output='cur',
+                     interval_ms=None, separator=','):
+        """This function is used to build the perf stat command with csv output
+        Parameters
+        ----------
+            events: comma separated event list
+            pid: attach to this process, system wide otherwise
+            interval_ms: print the counts every interval_ms milliseconds (-I)
+        """
+        cmd = ["perf", "stat", "-x", separator, "-e", events, "-o", output]
+        if pid is not None:
+            cmd += ["-p", str(pid)]
+        else:
+            cmd += ["-a"]
+        if interval_ms:
+            cmd += ["-I", str(int(interval_ms))]
+        return cmd
+
+    def normalize_event(self, name):
+        """This function is used to map the event names perf prints to the names
+        used in the data, e.g. cpu_core/cycles/ and cycles:u to cycles"""
+        name = name.strip()
+        if name.endswith("/") and "/" in name[:-1]:
+            # pmu/event/ 
+            name = name[:-1].split("/", 1)[1]
+        # tracepoints (sched:sched_switch) never match the modifier letters
+        name = self.MODIFIERS.sub("", name)
+        return self.ALIASES.get(name, name)
+
+    def iter_perf_csv(self, lines, separator=',', interval=False):
+        """This function is used to parse perf stat -x lines, it works on a file
+        and on the live output of perf in interval mode
+        Parameters
+        ----------
+            lines: iterable of lines
+            interval: the lines were written with -I and start with a timestamp
+        Returns
+        -------
+            generator of (timestamp, event, value), timestamp is None without -I
+            and value is nan for <not counted> and <not supported> events
+        """
+        for line in lines:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            fields = line.split(separator)
+            timestamp = None
+            if interval:
+                timestamp = float(fields[0])
+                fields = fields[1:]
+            # value, unit, event, run time, ...
+            if len(fields) < 3:
+                continue
+            try:
+                value = float(fields[0])
+            except ValueError:
+                value = np.nan
+            yield timestamp, self.normalize_event(fields[2]), value
+
+    def parse_perf_csv(self, filename='cur', separator=','):
+        """This function is used to parse the output of perf stat -x
+        Returns
+        -------
+            df: one row dataframe of float counts, one column per event
+        """
+        events = []
+        values = []
+        with open(filename, 'r') as f:
+            for _, event, value in self.iter_perf_csv(f, separator):
+                events.append(event)
+                values.append(value)
+        # tracepoint globs can repeat an event, keep the first count
+        counts = pd.Series(np.array(values, dtype=np.float64), index=events)
+        counts = counts[~counts.index.duplicated()]
+        return counts.to_frame().T.reset_index(drop=True)
+
+    def parse_perf_intervals(self, filename='cur', separator=','):
+        """This function is used to parse the output of perf stat -x -I
+        Returns
+        -------
+            df: dataframe of float counts per interval indexed by the interval 
+                end time in seconds, one column per event
+        """
+        with open(filename, 'r') as f:
+            records = list(self.iter_perf_csv(f, separator, interval=True))
+        if not records:
+            return pd.DataFrame()
+        times, events, values = zip(*records)
+        df = pd.DataFrame({"time": np.array(times, dtype=np.float64),
+                           "event": list(events),
+                           "value": np.array(values, dtype=np.float64)})
+        return df.pivot_table(index="time", columns="event", values="value",
+                              aggfunc="first", dropna=False)
@@ -0,0 +1,86 @@
+import numpy as np
+from scipy import stats
+
+class AdaptiveRepetition(object):
+    """This class is used to decide how often a configuration is measured. A
+    configuration is repeated until the confidence interval of the mean of every
+    objective is narrower than a relative width of the mean, or until the maximum
+    number of repetitions is reached.
+    """
+    def __init__(self, objectives, rel_width=0.05,
+                 confidence=0.95, min_repetitions=2,
+                 max_repetitions=10):
+        """
+        Parameters
+        ----------
+            objectives: measurement columns the interval is computed for
+            rel_width: target width of the confidence interval relative to the mean
+            confidence: confidence level of the interval
+            min_repetitions: repetitions before the interval is checked
+            max_repetitions: repetitions after which a configuration is given up
+        """
+        self.objectives = list(objectives)
+        self.rel_width = rel_width
+        self.confidence = confidence
+        self.min_repetitions = max(2, min_repetitions)
+        self.max_repetitions = max(self.min_repetitions, max_repetitions)
+        self.reset()
+
+    def reset(self):
+        """This function is used to start a new configuration"""
+        self.values = {obj: [] for obj in self.objectives}
+
+    def update(self, row):
+        """This function is used to add one measurement, a dict with the objectives"""
+        for obj in self.objectives:
+            self.values[obj].append(float(row[obj]))
+
+    @property
+    def count(self):
+        return len(self.values[self.objectives[0]]) if self.objectives else 0
+
+    def interval(self, obj):
+        """This function is used to compute the confidence interval of an objective
+        Returns
+        -------
+            mean: sample mean
+            half_width: half width of the t confidence interval
+            rel_width: full width of the interval relative to the mean
+        """
+        x = np.asarray(self.values[obj], dtype=np.float64)
+        n = len(x)
+        mean = float(np.mean(x)) if n else np.nan
+        if n < 2:
+            return mean, np.inf, np.inf
+        sem = np.std(x, ddof=1) / np.sqrt(n)
+        half_width = float(stats.t.ppf((1 + self.confidence) / 2, n - 1) * sem)
+        if mean == 0:
+            rel_width = 0.0 if half_width == 0 else np.inf
+        else:
+            rel_width = 2 * half_width / abs(mean)
+        return mean, half_width, rel_width
+
+    def is_stable(self):
+        return all(self.interval(obj)[2] <= self.rel_width for obj in self.objectives)
+
+    def done(self):
+        """This function is used to check if the configuration needs another run"""
+        if self.count < self.min_repetitions:
+            return False
+        return self.count >= self.max_repetitions or self.is_stable()
+
+    def get_stats(self):
+        """This function is used to get the repetition statistics of the configuration
+        Returns
+        -------
+            stats: dict with the number of repetitions, whether every interval reached
+                   the target width and the mean, half width and relative width of
+                   every objective
+        """
+        out = {"repetitions": self.count, "converged": self.is_stable()}
+        for obj in self.objectives:
+            mean, half_width, rel_width = self.interval(obj)
+            out["{0}_mean".format(obj)] = mean
+            out["{0}_ci".format(obj)] = half_width
+            out["{0}_ci_rel".format(obj)] = rel_width
+        return out
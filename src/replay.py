@@ -0,0 +1,68 @@
+import warnings
+import numpy as np
+
+class ReplayMeasurement(object):
+    """This class is used to answer interventions from recorded ground truth data
+    instead of measuring them on the device. Configurations are looked up through a
+    hash index on the configuration columns, configurations that were never recorded
+    get their nearest recorded neighbour.
+    """
+    def __init__(self, df, config_columns, decimals=6):
+        print("[STATUS]: Initializing ReplayMeasurement Class")
+        self.df = df.reset_index(drop=True)
+        self.config_columns = list(config_columns)
+        self.decimals = decimals
+        self.values = self.df.to_numpy(dtype=np.float64)
+        self.configs = self.df[self.config_columns].to_numpy(dtype=np.float64)
+        # repeated measurements of a configuration are averaged
+        self.index = {}
+        for row, config in enumerate(self.configs):
+            self.index.setdefault(self.make_key(config), []).append(row)
+        low = np.nanmin(self.configs, axis=0)
+        span = np.nanmax(self.configs, axis=0) - low
+        span[span == 0] = 1.0
+        self.low, self.span = low, span
+        self.scaled = np.nan_to_num((self.configs - low) / span)
+
+    @classmethod
+    def from_dataset(cls, dataset, mode, hardware,
+                     software, columns, config_columns):
+        """This function is used to build the replay backend of a target from
+        Data/GroundTruth"""
+        df = dataset.load("GroundTruth", mode, hardware, software, columns)
+        return cls(df, config_columns)
+
+    def make_key(self, config):
+        return tuple(np.round(np.asarray(config, dtype=np.float64), self.decimals))
+
+    def lookup(self, config):
+        """This function is used to measure one configuration
+        Parameters
+        ----------
+            config: dict with a value for every configuration column
+        Returns
+        -------
+            measured: dict of all recorded columns of the matched configuration, 
+                      plus "match" (exact or nearest) and its "distance"
+        """
+        x = np.array([config[col] for col in self.config_columns], dtype=np.float64)
+        rows = self.index.get(self.make_key(x))
+        if rows is not None:
+            match, distance = "exact", 0.0
+        else:
+            dist = np.sqrt((((x - self.low) / self.span - self.scaled) ** 2).sum(axis=1))
+            nearest = int(np.argmin(dist))
+            rows = self.index[self.make_key(self.configs[nearest])]
+            match, distance = "nearest", float(dist[nearest])
+        with warnings.catch_warnings():
+            # columns that were never recorded stay nan
+            warnings.simplefilter("ignore", category=RuntimeWarning)
+            values = np.nanmean(self.values[rows], axis=0)
+        measured = dict(zip(self.df.columns, values.tolist()))
+        measured["match"] = match
+        measured["distance"] = distance
+        return measured
+
+    def __call__(self, configs):
+        """This function is used to measure a batch of configurations"""
+        return [self.lookup(config) for config in configs]
@@ -0,0 +1,130 @@
+import os
+import json
+import pandas as pd
+
+def _to_json(obj):
+    # numpy scalars
+    if hasattr(obj, "item"):
+        return obj.item()
+    return str(obj)
+
+class ResultsWriter(object):
+    """This class is used to append measurements to a JSON lines log.
+    Rows are buffered and written in batches, a checkpoint record marks a
+    configuration as complete and the file is fsynced when a batch is flushed.
+    Rows without a checkpoint (an interrupted configuration) are ignored when the
+    log is read back, so an interrupted sweep resumes from the last completed
+    configuration.
+    """
+    def __init__(self, path, batch_size=10):
+        """
+        Parameters
+        ----------
+            path: JSON lines log file
+            batch_size: number of completed configurations per flush
+        """
+        print("[STATUS]: Initializing ResultsWriter Class")
+        self.path = path
+        self.batch_size = batch_size
+        self.buffer = []
+        self.pending = 0
+        self.CHECKPOINT = "_checkpoint"
+        self.truncate_uncommitted()
+        self.fh = open(self.path, "a")
+
+    def truncate_uncommitted(self):
+        """This function is used to drop everything after the last checkpoint of the
+        log, the rows of a configuration whose run was interrupted and a torn last
+        line. Otherwise the rows of the aborted run would be counted with the rows of
+        the next run of the configuration and the next append would be glued to the
+        torn line"""
+        if not os.path.isfile(self.path):
+            return
+        marker = json.dumps(self.CHECKPOINT).encode()
+        end = 0
+        with open(self.path, "rb+") as f:
+            pos = 0
+            for line in f:
+                pos += len(line)
+                if marker in line and line.endswith(b"\n"):
+                    try:
+                        if self.CHECKPOINT in json.loads(line):
+                            end = pos
+                    except ValueError:
+                        continue
+            if end < pos:
+                print("[WARNING]: dropping {0} bytes of uncommitted records at the "
+                      "end of {1}".format(pos - end, self.path))
+                f.truncate(end)
+
+    def append(self, config_id, row):
+        """This function is used to buffer one measurement of a configuration"""
+        record = dict(row)
+        record["config_id"] = config_id
+        self.buffer.append(json.dumps(record, default=_to_json))
+
+    def commit(self, config_id):
+        """This function is used to mark a configuration as complete"""
+        self.buffer.append(json.dumps({self.CHECKPOINT: config_id}, default=_to_json))
+        self.pending += 1
+        if self.pending >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """This function is used to write the buffered records and fsync the log"""
+        if self.buffer:
+            self.fh.write("\n".join(self.buffer) + "\n")
+            self.fh.flush()
+            os.fsync(self.fh.fileno())
+        self.buffer = []
+        self.pending = 0
+
+    def close(self):
+        self.flush()
+        self.fh.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def read_records(self):
+        """This function is used to read the rows of the completed configurations
+        Returns
+        -------
+            rows: list of dicts
+            completed: set of completed configuration ids
+        """
+        rows = []
+        completed = set()
+        pending = []
+        if not os.path.isfile(self.path):
+            return rows, completed
+        with open(self.path, "r") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # torn write at the end of an interrupted sweep
+                    continue
+                if self.CHECKPOINT in record:
+                    config_id = record[self.CHECKPOINT]
+                    rows.extend(r for r in pending if r["config_id"] == config_id)
+                    pending = [r for r in pending if r["config_id"] != config_id]
+                    completed.add(config_id)
+                else:
+                    pending.append(record)
+        return rows, completed
+
+    def completed(self):
+        """This function is used to get the ids of the completed configurations"""
+        return self.read_records()[1]
+
+    def to_dataframe(self):
+        return pd.DataFrame(self.read_records()[0])
+
+    def to_csv(self, filename):
+        """This function is used to export the completed rows as csv"""
+        self.flush()
+        self.to_dataframe().to_csv(filename)
@@ -0,0 +1,155 @@
+import os
+import time
+import threading
+import numpy as np
+
+class SysfsSampler(object):
+    """This class is used to sample sysfs/iio sensor files in the background.
+    The files are opened once and read with os.pread, samples are stored with their
+    timestamp in preallocated ring buffers.
+    """
+    def __init__(self, channels, rate=10.0,
+                 capacity=8192, root="/"):
+        """
+        Parameters
+        ----------
+            channels: dict mapping channel names to sensor files
+            rate: samples per second
+            capacity: number of samples kept, older samples are overwritten
+            root: directory the sensor paths are resolved against, e.g. a fake
+                  sysfs tree
+        """
+        print("[STATUS]: Initializing SysfsSampler Class")
+        self.names = list(channels)
+        self.rate = rate
+        self.capacity = capacity
+        self.fds = []
+        for name in self.names:
+            path = os.path.join(root, str(channels[name]).lstrip("/"))
+            try:
+                self.fds.append(os.open(path, os.O_RDONLY))
+            except OSError as e:
+                # e.g. a missing node or a debugfs node without permission, the
+                # channel reads nan
+                print("[WARNING]: cannot open {0} for {1}: {2}".format(path, name, e))
+                self.fds.append(-1)
+        self.times = np.zeros(capacity)
+        self.values = np.zeros((capacity, len(self.names)))
+        self.count = 0
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    @classmethod
+    def from_config(cls, system, rate=10.0,
+                    capacity=8192, root="/"):
+        """This function is used to create the sampler of the INA power monitor and 
+        the thermal zones of a system
+        Parameters
+        ----------
+            system: the cfg.systems entry of the current system
+        """
+        channels = {}
+        for kind in ("power", "temperature"):
+            for name, filename in system[kind].items():
+                channels["{0}_{1}".format(name, kind)] = filename
+        return cls(channels, rate, capacity, root)
+
+    def read(self):
+        """This function is used to read all the channels once
+        Returns
+        -------
+            values: array with one value per channel, nan for unreadable files
+        """
+        values = np.empty(len(self.fds))
+        for i, fd in enumerate(self.fds):
+            if fd < 0:
+                values[i] = np.nan
+                continue
+            try:
+                values[i] = float(os.pread(fd, 64, 0).split()[0])
+            except (OSError, ValueError, IndexError):
+                values[i] = np.nan
+        return values
+
+    def sample(self):
+        """This function is used to take one timestamped sample"""
+        pos = self.count % self.capacity
+        self.times[pos] = time.monotonic()
+        self.values[pos] = self.read()
+        self.count += 1
+
+    def run(self):
+        interval = 1.0 / self.rate
+        next_time = time.monotonic()
+        while not self.stop_event.is_set():
+            self.sample()
+            next_time += interval
+            self.stop_event.wait(max(0.0, next_time - time.monotonic()))
+
+    def start(self):
+        """This function is used to start sampling in a background thread"""
+        self.count = 0
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """This function is used to stop sampling, a last sample closes the window"""
+        if self.thread is not None:
+            self.stop_event.set()
+            self.thread.join()
+            self.thread = None
+            self.sample()
+        return self
+
+    def close(self):
+        self.stop()
+        for fd in self.fds:
+            if fd >= 0:
+                os.close(fd)
+        self.fds = []
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def get_samples(self, channel=None):
+        """This function is used to get the samples in time order
+        Returns
+        -------
+            times: array of timestamps in seconds
+            values: array of samples, of one channel if given
+        """
+        n = min(self.count, self.capacity)
+        order = (np.arange(n) + self.count - n) % self.capacity
+        times = self.times[order]
+        values = self.values[order]
+        if channel is not None:
+            values = values[:, self.names.index(channel)]
+        return times, values
+
+    def energy(self, channel):
+        """This function is used to integrate a power channel over time with the
+        trapezoidal rule, e.g. mW samples give mJ"""
+        times, values = self.get_samples(channel)
+        keep = ~np.isnan(values)
+        times, values = times[keep], values[keep]
+        if len(times) < 2:
+            return 0.0
+        return float(np.sum((values[1:] + values[:-1]) * np.diff(times)) / 2)
+
+    def energy_sum(self, channel, period=0.5):
+        """This function is used to get the energy on the scale of the data in Data/,
+        the sum of the power samples read every period seconds. It is the integral
+        divided by period, so it does not depend on the sampling rate"""
+        return self.energy(channel) / period
+
+    def mean(self, channel):
+        """This function is used to average a channel, e.g. a temperature"""
+        _, values = self.get_samples(channel)
+        if np.all(np.isnan(values)):
+            return 0.0
+        return float(np.nanmean(values))
@@ -1,31 +1,86 @@
+import os
 import time
 import json
-from flask import Flask, request, jsonify
-from cadet.workload import Workload
-            
+import threading
+import numpy as np
+from flask import Flask, request, jsonify, Response
+from werkzeug.serving import WSGIRequestHandler
+from cadet.workload import get_workload
+from cadet.histogram import Histogram
+from cadet.Configuration import Config as cfg
+
 class SetWorkload():
     """This class is used to set workload and run as a flask app
-    after initialization. 
+    after initialization. The model is warmed up before the server starts,
+    requests run in batches with a bounded number of concurrent inferences and the
+    latency and throughput of every request are exposed on /metrics. The server
+    listens on the unix domain socket of the inference client when one is set,
+    on the tcp port otherwise.
     """
-    def __init__(self, options):
+    def __init__(self, options, serve=True):
+        server = cfg.workload_server
+        self.batch_size = server["batch_size"]
+        self.num_samples = server["num_samples"]
+        self.warm_up = server["warm_up"]
+        self.concurrency = server["concurrency"]
+        self.host = self.get_host(cfg.inference["socket"])
+        self.port = server["port"]
         self.app=self.create_app(options)
-        self.app.run()
-    
+        if serve:
+            self.serve()
+
+    @staticmethod
+    def get_host(socket_path=None):
+        """This function is used to get the host the server binds, werkzeug binds a
+        unix domain socket for a unix:// host"""
+        if socket_path:
+            return "unix://" + os.path.abspath(socket_path)
+        return "127.0.0.1"
+
+    def serve(self):
+        # keep-alive for the inference client
+        WSGIRequestHandler.protocol_version = "HTTP/1.1"
+        self.app.run(host=self.host, port=self.port, threaded=self.concurrency > 1)
+
     def create_app(self, opt):
         """This function is used to create an app
         """
         app=Flask(__name__)
-        if opt['software_system']=='Image':
-            swl=Workload()
-            model, test_data = swl.get_image_params()
-            model._make_predict_function()    
-                           
+        swl=get_workload(opt['software_system'])
+        swl.configure(opt.get('properties'))
+        if not swl.config:
+            swl.load()
+        # first calls build the graph and allocate memory, keep them out of the
+        # measured requests
+        for _ in range(self.warm_up):
+            swl.run(self.batch_size, self.batch_size)
+        slots = threading.BoundedSemaphore(max(1, self.concurrency))
+        latency = Histogram("inference_latency_seconds",
+                            np.logspace(-3, 3, 25))
+        throughput = Histogram("inference_throughput_{0}_per_second".format(swl.unit),
+                               np.logspace(0, 6, 25))
+        self.latency, self.throughput = latency, throughput
+
         @app.route('/api',methods=['POST'])
         def predict():
-            data=request.get_json(force=True)
-            start=time.time() 
-            output=model.predict(test_data)    
-            duration=time.time()-start           
-            return jsonify(json.dumps({'time':duration}))
-                        
-        return app 
+            data=request.get_json(force=True) or {}
+            batch_size = int(data.get('batch_size', self.batch_size))
+            num_samples = data.get('num_samples', self.num_samples)
+            # software options of the configuration under test, they are not 
+            # changed while other requests run
+            with swl.session(data.get('options')), slots:
+                start=time.time()
+                units=swl.run(batch_size, num_samples)
+                duration=time.time()-start
+            rate = units / duration if duration > 0 else 0.0
+            latency.observe(duration)
+            throughput.observe(rate)
+            return jsonify(json.dumps({'time':duration, 'units':units,
+                                       'unit':swl.unit, 'throughput':rate}))
+
+        @app.route('/metrics',methods=['GET'])
+        def metrics():
+            body = latency.to_prometheus() + "\n" + throughput.to_prometheus() + "\n"
+            return Response(body, mimetype="text/plain")
+
+        return app
@@ -0,0 +1,100 @@
+import time
+import warnings
+import numpy as np
+
+from cadet.sampler import SysfsSampler
+
+class SettleDetector(object):
+    """This class is used to wait until the clocks and temperatures of the device
+    are stable after a configuration change. The current frequency and temperature
+    nodes are polled until every channel stayed within its tolerance for a window
+    of samples, or until the timeout.
+    """
+    def __init__(self, frequency, temperature, rate=10.0,
+                 window=10, freq_tol=0.01, temp_tol=500,
+                 timeout=10.0, root="/"):
+        """
+        Parameters
+        ----------
+            frequency: dict mapping names to current frequency files
+            temperature: dict mapping names to temperature files
+            rate: polls per second
+            window: number of consecutive polls that must be within tolerance
+            freq_tol: allowed spread of a frequency relative to its value
+            temp_tol: allowed spread of a temperature, in the unit of the file
+                      (millidegrees on the thermal zones)
+            timeout: seconds after which the device is considered settled anyway
+        """
+        print("[STATUS]: Initializing SettleDetector Class")
+        channels = {}
+        for name, filename in frequency.items():
+            channels["{0}_frequency".format(name)] = filename
+        for name, filename in temperature.items():
+            channels["{0}_temperature".format(name)] = filename
+        self.sampler = SysfsSampler(channels, rate, max(window, 2), root)
+        self.is_freq = np.array([name.endswith("_frequency")
+                                 for name in self.sampler.names])
+        self.rate = rate
+        self.window = window
+        self.freq_tol = freq_tol
+        self.temp_tol = temp_tol
+        self.timeout = timeout
+
+    @classmethod
+    def from_config(cls, system, **kwargs):
+        """This function is used to create the detector from the frequency.current
+        and temperature nodes of a system
+        Parameters
+        ----------
+            system: the cfg.systems entry of the current system
+        """
+        frequency = {}
+        for dev in ("cpu", "gpu", "emc"):
+            current = system[dev]["frequency"].get("current")
+            if current:
+                frequency[dev] = current
+        return cls(frequency, system["temperature"], **kwargs)
+
+    def is_stable(self):
+        """This function is used to check the last window of polls"""
+        if self.sampler.count < self.window:
+            return False
+        _, values = self.sampler.get_samples()
+        values = values[-self.window:]
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", category=RuntimeWarning)
+            spread = np.nanmax(values, axis=0) - np.nanmin(values, axis=0)
+            level = np.abs(np.nanmax(values, axis=0))
+        # unreadable channels do not hold the measurement back
+        spread = np.nan_to_num(spread)
+        level = np.nan_to_num(level)
+        freq_ok = spread[self.is_freq] <= self.freq_tol * level[self.is_freq]
+        temp_ok = spread[~self.is_freq] <= self.temp_tol
+        return bool(np.all(freq_ok) and np.all(temp_ok))
+
+    def wait(self):
+        """This function is used to block until the device settled
+        Returns
+        -------
+            settle_time: seconds until the device settled
+            settled: False if the timeout was reached
+        """
+        if not self.sampler.names:
+            return 0.0, True
+        self.sampler.count = 0
+        interval = 1.0 / self.rate
+        start = time.monotonic()
+        next_time = start
+        while True:
+            self.sampler.sample()
+            elapsed = time.monotonic() - start
+            if self.is_stable():
+                return elapsed, True
+            if elapsed >= self.timeout:
+                print("[WARNING]: device did not settle in {0}s".format(self.timeout))
+                return elapsed, False
+            next_time += interval
+            time.sleep(max(0.0, next_time - time.monotonic()))
+
+    def close(self):
+        self.sampler.close()
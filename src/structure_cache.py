@@ -0,0 +1,109 @@
+import os
+import json
+import time
+import hashlib
+import numpy as np
+
+def fingerprint(df):
+    """This function is used to compute a fingerprint of a dataframe
+    Returns
+    -------
+        digest: sha1 digest of the column names and values
+    """
+    digest = hashlib.sha1()
+    digest.update(json.dumps([str(col) for col in df.columns]).encode())
+    values = np.ascontiguousarray(df.to_numpy(dtype=np.float64))
+    digest.update(str(values.shape).encode())
+    digest.update(values.tobytes())
+    return digest.hexdigest()
+
+class StructureCache(object):
+    """This class is used to cache learned causal structures (resolved directed
+    and bi-directed edges) on disk with least recently used eviction
+    """
+    def __init__(self, cache_dir, max_entries=128):
+        print("[STATUS]: Initializing StructureCache Class")
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.index_file = os.path.join(self.cache_dir, "index.json")
+        if not os.path.isdir(self.cache_dir):
+            os.makedirs(self.cache_dir)
+        self.index = self.read_index()
+
+    def make_key(self, df, columns,
+                 tabu_edges, thres, **params):
+        """This function is used to build the cache key of a structure
+        Parameters
+        ----------
+            df: dataframe the structure is learned from
+            columns: nodes of the causal graph
+            tabu_edges: forbidden edges
+            thres: NOTEARS weight threshold
+            params: any other structure learning hyperparameters
+        Returns
+        -------
+            key: sha1 digest
+        """
+        desc = {"data": fingerprint(df),
+                "columns": sorted(columns),
+                "tabu_edges": sorted([list(edge) for edge in tabu_edges]),
+                "thres": thres,
+                "params": sorted([[k, str(v)] for k, v in params.items()])}
+        return hashlib.sha1(json.dumps(desc).encode()).hexdigest()
+
+    def get(self, key):
+        """This function is used to look up a cached structure
+        Returns
+        -------
+            (di_edges, bi_edges) or None if the key is not cached
+        """
+        if key not in self.index:
+            return None
+        try:
+            with open(self.entry_path(key), "r") as f:
+                entry = json.load(f)
+        except (IOError, ValueError):
+            del self.index[key]
+            self.write_index()
+            return None
+        self.index[key] = time.time()
+        self.write_index()
+        di_edges = [tuple(edge) for edge in entry["di_edges"]]
+        bi_edges = [tuple(edge) for edge in entry["bi_edges"]]
+        return di_edges, bi_edges
+
+    def put(self, key, di_edges, bi_edges):
+        """This function is used to store a structure and evict the least recently
+        used entries"""
+        entry = {"di_edges": [list(edge) for edge in di_edges],
+                 "bi_edges": [list(edge) for edge in bi_edges]}
+        self.atomic_write(self.entry_path(key), entry)
+        self.index[key] = time.time()
+        while len(self.index) > self.max_entries:
+            oldest = min(self.index, key=self.index.get)
+            del self.index[oldest]
+            try:
+                os.remove(self.entry_path(oldest))
+            except OSError:
+                pass
+        self.write_index()
+
+    def entry_path(self, key):
+        return os.path.join(self.cache_dir, "{0}.json".format(key))
+
+    def read_index(self):
+        """This function is used to read the access time index"""
+        try:
+            with open(self.index_file, "r") as f:
+                return json.load(f)
+        except (IOError, ValueError):
+            return {}
+
+    def write_index(self):
+        self.atomic_write(self.index_file, self.index)
+
+    def atomic_write(self, path, obj):
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(obj, f)
+        os.replace(tmp, path)
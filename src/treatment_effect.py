@@ -0,0 +1,116 @@
+import numpy as np
+import pandas as pd
+
+class TreatmentEffect(object):
+    """This class is used to score candidate values of configuration options in batch.
+    For every option one outcome regression E[objective | option, covariates] is
+    fitted and all the candidate values are evaluated with a single matrix product.
+    The covariates are the adjustment set of the option, its parents in the causal
+    graph, and the modifiers, the other options of the configuration. The options
+    have no parents under the tabu edges, so the modifiers and their interactions
+    with the option are what makes the effect individual, it is predicted at the
+    option values of the unit instead of the population.
+    """
+    def __init__(self, df, G, objective, modifiers=None):
+        self.df = df
+        self.G = G
+        self.objective = objective
+        self.modifiers = list(modifiers or [])
+        self.models = {}
+
+    def adjustment_set(self, option):
+        """This function is used to get the back-door adjustment set of an option"""
+        try:
+            parents = set(self.G.parents([option]))
+        except (AttributeError, KeyError):
+            parents = set()
+        return sorted(p for p in parents
+                      if p != self.objective and p in self.df.columns)
+
+    def covariates(self, option):
+        """This function is used to get the adjustment set and the modifiers of an
+        option"""
+        adjust = self.adjustment_set(option)
+        modifiers = [m for m in self.modifiers 
+                     if m not in adjust and m not in (option, self.objective)
+                     and m in self.df.columns]
+        return adjust + modifiers
+
+    def design(self, x, Z):
+        """This function is used to build the regression features 
+        [1, x, x^2, Z, x*Z]"""
+        x = np.asarray(x, dtype=np.float64).reshape(-1, 1)
+        ones = np.ones_like(x)
+        Z = np.broadcast_to(Z, (len(x), Z.shape[-1]))
+        return np.hstack([ones, x, x * x, Z, x * Z])
+
+    def fit(self, option):
+        """This function is used to fit the outcome regression of an option"""
+        if option in self.models:
+            return self.models[option]
+        covariates = self.covariates(option)
+        data = self.df[[option, self.objective] + covariates].dropna()
+        x = data[option].to_numpy(dtype=np.float64)
+        # scale x and Z so that x^2 and x*Z stay well conditioned for frequencies
+        scale = np.abs(x).max() or 1.0
+        Z = data[covariates].to_numpy(dtype=np.float64).reshape(len(data), 
+                                                                len(covariates))
+        z_scale = np.abs(Z).max(axis=0) if len(Z) else np.ones(len(covariates))
+        z_scale[z_scale == 0] = 1.0
+        X = self.design(x / scale, Z / z_scale)
+        y = data[self.objective].to_numpy(dtype=np.float64)
+        coef = np.linalg.lstsq(X, y, rcond=None)[0]
+        self.models[option] = (coef, covariates, scale, z_scale, Z.mean(axis=0))
+        return self.models[option]
+
+    def predict(self, option, values, unit=None):
+        """This function is used to predict the objective under do(option=value) for
+        all values at once
+        Parameters
+        ----------
+            values: candidate values of the option
+            unit: row (dict or Series) of the individual, None for the population
+        Returns
+        -------
+            pred: array of predicted objective values
+        """
+        coef, covariates, scale, z_scale, z_mean = self.fit(option)
+        Z = z_mean.copy()
+        if unit is not None:
+            # covariates the unit does not have are set to their mean
+            for k, c in enumerate(covariates):
+                if c in unit and not pd.isna(unit[c]):
+                    Z[k] = float(unit[c])
+        X = self.design(np.asarray(values, dtype=np.float64) / scale,
+                        (Z / z_scale).reshape(1, len(covariates)))
+        return X @ coef
+
+    def rank(self, options, domains, unit=None):
+        """This function is used to score every candidate value of every option
+        Parameters
+        ----------
+            options: options to intervene on
+            domains: dict mapping options to candidate values
+            unit: row of the individual (e.g. the bug configuration)
+        Returns
+        -------
+            table: dataframe (option, value, effect) sorted by effect, the predicted
+                   change of the objective, most negative first
+        """
+        rows = []
+        for option in options:
+            values = np.asarray(domains[option], dtype=np.float64)
+            if len(values) == 0:
+                continue
+            if unit is not None and option in unit:
+                current = float(unit[option])
+            else:
+                current = float(self.df[option].mean())
+            pred = self.predict(option, np.append(values, current), unit)
+            effect = pred[:-1] - pred[-1]
+            rows.append(pd.DataFrame({"option": option, "value": values,
+                                      "effect": effect}))
+        if not rows:
+            return pd.DataFrame(columns=["option", "value", "effect"])
+        table = pd.concat(rows, ignore_index=True)
+        return table.sort_values("effect", kind="mergesort").reset_index(drop=True)
@@ -11,6 +11,7 @@ from datetime import datetime
 
 from cadet.Configuration import Config as cfg
 from cadet.set_workload import SetWorkload
+from cadet.workload import WORKLOADS
 
 def process_input():
     """This function is used to process input passed by user to select experiment.
@@ -20,16 +21,21 @@ def process_input():
     """
     options={}
     options['software_system']=sys.argv[1]
-    # Deep Neural Network Systems1
-    if options['software_system']=='Image':
-       options['properties']={}
-           
+    # initial software options, the measurement client sends the options of 
+    # every configuration with its requests
+    options['properties']={}
+    
     return options
                              
 if __name__=='__main__':
     options=process_input()
-    if options['software_system']=='Image':
+    # the measurement daemon attaches perf to this process
+    with open(cfg.workload_pid_file, 'w') as f:
+        f.write(str(os.getpid()))
+    if options['software_system'] in WORKLOADS:
             SWL=SetWorkload(options)
+    else:
+            print("[ERROR]: software system not supported")
             
     
    
@@ -1,21 +1,302 @@
+import os
+import re
+import abc
+import sqlite3
+import threading
+import contextlib
+import tempfile
+import subprocess
 import numpy as np
-class Workload(object):
-    """This class is used to initialize workload
+from cadet.Configuration import Config as cfg
+
+# registered workloads by software system name
+WORKLOADS = {}
+
+def register_workload(cls):
+    """This function is used to register a workload class under its name"""
+    WORKLOADS[cls.name] = cls
+    return cls
+
+def get_workload(name):
+    """This function is used to create the workload of a software system"""
+    if name not in WORKLOADS:
+        raise KeyError("[ERROR]: software system {0} not supported".format(name))
+    return WORKLOADS[name]()
+
+class Workload(abc.ABC):
+    """This class is used to initialize workload. A workload declares its software
+    configuration options, how it is loaded and run, and the unit of its throughput.
+    Its models and inputs are read from the workload_artifacts of the configuration.
     """
+    name = None
+    # software option columns and their candidate values
+    options = {}
+    # unit of work the throughput is counted in
+    unit = "samples"
+
     def __init__(self):
-        print ("[STATUS]: Initializing Image Class") 
- 
+        print ("[STATUS]: Initializing {0} Class".format(self.name))
+        self.config = {}
+        # runs in flight and requests waiting to change the options
+        self.gate = threading.Condition()
+        self.in_flight = 0
+        self.waiting = 0
+
+    @classmethod
+    def get_option_columns(cls):
+        """This function is used to get the software option columns"""
+        return list(cls.options)
+
+    @classmethod
+    def get_option_values(cls):
+        """This function is used to get the candidate values of the options
+        Returns
+        -------
+            software_var: list of option domains, in the order of the columns"""
+        return [tuple(values) for values in cls.options.values()]
+
+    def get_changes(self, config):
+        """This function is used to get the options of config that differ from the
+        applied options"""
+        return {k: v for k, v in (config or {}).items() 
+                if k in self.options and self.config.get(k) != v}
+
+    def configure(self, config):
+        """This function is used to apply software options, the workload is loaded
+        again when they changed
+        Returns
+        -------
+            changed: whether the options changed
+        """
+        changes = self.get_changes(config)
+        if not changes:
+            return False
+        self.config.update(changes)
+        self.load()
+        return True
+
+    @contextlib.contextmanager
+    def session(self, config):
+        """This function is used to run the workload with the given options from
+        concurrent requests. Runs with the applied options share the workload, a 
+        request with other options waits until the runs in flight finished and 
+        changes the options alone, runs arriving meanwhile wait for it, so every
+        run is measured with the options it asked for."""
+        with self.gate:
+            change = bool(self.get_changes(config))
+            self.waiting += change
+            while True:
+                if self.get_changes(config):
+                    if not self.in_flight:
+                        self.configure(config)
+                        break
+                elif change or not self.waiting:
+                    break
+                self.gate.wait()
+            self.waiting -= change
+            self.in_flight += 1
+            self.gate.notify_all()
+        try:
+            yield self
+        finally:
+            with self.gate:
+                self.in_flight -= 1
+                self.gate.notify_all()
+
+    def get_artifact(self, key):
+        """This function is used to get the path of a model or input file of the
+        workload"""
+        artifacts = cfg.workload_artifacts.get(self.name) or {}
+        if key not in artifacts:
+            raise KeyError("[ERROR]: workload_artifacts.{0}.{1} is not set in the "
+                           "configuration".format(self.name, key))
+        path = artifacts[key]
+        if not os.path.isfile(path):
+            raise FileNotFoundError("[ERROR]: {0} {1} {2} does not exist, see "
+                                    "workload_artifacts.{0}.{1} in the "
+                                    "configuration".format(self.name, key, path))
+        return path
+
+    @abc.abstractmethod
+    def load(self):
+        """This function is used to load the model or data of the workload"""
+
+    @abc.abstractmethod
+    def run(self, batch_size=None, num_samples=None):
+        """This function is used to run the workload once
+        Returns
+        -------
+            units: units of work processed, e.g. samples or frames
+        """
+
     def get_image_params(self):
-        """This function is used to load pretrained model"""      
-        try:           
-               # xception          
+        """This function is used to load pretrained model"""
+        model_file = self.get_artifact("model")
+        try:
+               # xception
                 from tensorflow.keras.models import load_model
-                from tensorflow.keras.datasets import cifar10 
-                (_, _), (x_test, _) = cifar10.load_data() 
-                x_test = (x_test / 255.0).astype(np.float32) 
-                model=load_model('Xception.h5')
+                from tensorflow.keras.datasets import cifar10
+                (_, _), (x_test, _) = cifar10.load_data()
+                x_test = (x_test / 255.0).astype(np.float32)
+                model=load_model(model_file)
                 return model, x_test
         except Exception as e:
-            print("[ERROR]: Xception model load failed due to {0}".format(str(e)))    
-    
-         
+            print("[ERROR]: Xception model load failed due to {0}".format(str(e)))
+
+class KerasWorkload(Workload):
+    """This class is used to run a keras model on a test set"""
+    options = {"memory_growth": (-1, 0.5, 0.9)}
+
+    def set_memory(self):
+        """This function is used to set the gpu memory fraction, -1 lets the memory
+        grow on demand"""
+        import tensorflow as tf
+        fraction = self.config.get("memory_growth", -1)
+        tf_config = tf.compat.v1.ConfigProto()
+        if float(fraction) < 0:
+            tf_config.gpu_options.allow_growth = True
+        else:
+            tf_config.gpu_options.per_process_gpu_memory_fraction = float(fraction)
+        tf.keras.backend.clear_session()
+        tf.compat.v1.keras.backend.set_session(tf.compat.v1.Session(config=tf_config))
+
+    @abc.abstractmethod
+    def get_data(self):
+        """This function is used to load the model and the test set
+        Returns
+        -------
+            model, x_test
+        """
+
+    def load(self):
+        self.set_memory()
+        self.model, self.test_data = self.get_data()
+        if hasattr(self.model, "_make_predict_function"):
+            # the server predicts from request threads
+            self.model._make_predict_function()
+
+    def count_units(self, x):
+        return len(x)
+
+    def run(self, batch_size=None, num_samples=None):
+        x = self.test_data if num_samples is None else self.test_data[:int(num_samples)]
+        self.model.predict(x, batch_size=batch_size)
+        return self.count_units(x)
+
+@register_workload
+class ImageWorkload(KerasWorkload):
+    """Xception on the cifar10 test set, throughput in images/s"""
+    name = "Image"
+    unit = "images"
+
+    def get_data(self):
+        return self.get_image_params()
+
+@register_workload
+class NLPWorkload(KerasWorkload):
+    """A text classifier on the imdb test set, throughput in tokens/s"""
+    name = "NLP"
+    unit = "tokens"
+    MAXLEN = 200
+
+    def get_data(self):
+        from tensorflow.keras.models import load_model
+        from tensorflow.keras.datasets import imdb
+        from tensorflow.keras.preprocessing.sequence import pad_sequences
+        (_, _), (x_test, _) = imdb.load_data(num_words=20000)
+        x_test = pad_sequences(x_test, maxlen=self.MAXLEN)
+        return load_model(self.get_artifact("model")), x_test
+
+    def count_units(self, x):
+        # padding is not a token
+        return int(np.count_nonzero(x))
+
+@register_workload
+class SpeechWorkload(KerasWorkload):
+    """A speech recognition model on preprocessed test utterances, throughput in
+    utterances/s"""
+    name = "Speech"
+    unit = "utterances"
+
+    def get_data(self):
+        from tensorflow.keras.models import load_model
+        return (load_model(self.get_artifact("model")),
+                np.load(self.get_artifact("data")))
+
+@register_workload
+class X264Workload(Workload):
+    """x264 encoding of a raw test video, throughput in frames/s"""
+    name = "x264"
+    unit = "frames"
+    options = {"preset": ("ultrafast", "veryfast", "medium"),
+               "bitrate": (1000, 2500, 5000),
+               "deblock": (0, 1)}
+
+    def load(self):
+        self.video = self.get_artifact("video")
+
+    def run(self, batch_size=None, num_samples=None):
+        cmd = ["x264", "--preset", str(self.config.get("preset", "medium")),
+               "--bitrate", str(self.config.get("bitrate", 2500)),
+               "--threads", "auto", "-o", os.devnull, self.video]
+        if str(self.config.get("deblock", 1)) == "0":
+            cmd.insert(1, "--no-deblock")
+        if num_samples is not None:
+            cmd[1:1] = ["--frames", str(int(num_samples))]
+        out = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                             universal_newlines=True).stdout
+        frames = re.search(r"encoded (\d+) frames", out)
+        return int(frames.group(1)) if frames else 0
+
+@register_workload
+class SQLiteWorkload(Workload):
+    """A mix of inserts, point and range queries on a sqlite database, throughput
+    in queries/s"""
+    name = "SQLite"
+    unit = "queries"
+    options = {"journal_mode": ("DELETE", "WAL", "MEMORY"),
+               "synchronous": ("OFF", "NORMAL", "FULL"),
+               "cache_size": (2000, 10000),
+               "page_size": (1024, 4096)}
+    ROWS = 100000
+
+    def load(self):
+        if getattr(self, "db", None) is not None:
+            self.db.close()
+        self.path = os.path.join(tempfile.gettempdir(), "cadet_sqlite.db")
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(self.path + suffix):
+                os.remove(self.path + suffix)
+        self.db = sqlite3.connect(self.path, check_same_thread=False)
+        # the page size only applies to a new database
+        self.db.execute("PRAGMA page_size={0}".format(int(self.config.get("page_size", 4096))))
+        self.db.execute("PRAGMA journal_mode={0}".format(self.config.get("journal_mode", "DELETE")))
+        self.db.execute("PRAGMA synchronous={0}".format(self.config.get("synchronous", "FULL")))
+        self.db.execute("PRAGMA cache_size={0}".format(int(self.config.get("cache_size", 2000))))
+        self.db.execute("CREATE TABLE data (id INTEGER PRIMARY KEY, key INTEGER, value TEXT)")
+        rng = np.random.default_rng(0)
+        keys = rng.integers(0, self.ROWS, self.ROWS)
+        self.db.executemany("INSERT INTO data (key, value) VALUES (?, ?)",
+                            ((int(k), "v{0}".format(k)) for k in keys))
+        self.db.execute("CREATE INDEX data_key ON data (key)")
+        self.db.commit()
+        self.rng = np.random.default_rng(1)
+
+    def run(self, batch_size=None, num_samples=None):
+        num_queries = int(num_samples or 10000)
+        # queries per transaction
+        batch_size = int(batch_size or 100)
+        keys = self.rng.integers(0, self.ROWS, num_queries)
+        cur = self.db.cursor()
+        for start in range(0, num_queries, batch_size):
+            for i, k in enumerate(keys[start:start + batch_size]):
+                k = int(k)
+                if i % 4 == 0:
+                    cur.execute("INSERT INTO data (key, value) VALUES (?, ?)", (k, "n"))
+                elif i % 4 == 1:
+                    cur.execute("SELECT count(*) FROM data WHERE key BETWEEN ? AND ?",
+                                (k, k + 100)).fetchall()
+                else:
+                    cur.execute("SELECT value FROM data WHERE key = ?", (k,)).fetchall()
+            self.db.commit()
+        return num_queries
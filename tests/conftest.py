@@ -0,0 +1,21 @@
+import os
+import sys
+import types
+import yaml
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC = os.path.join(ROOT, "src")
+
+# the cadet package is the src directory, cadet.py at the root has the same name
+cadet = types.ModuleType("cadet")
+cadet.__path__ = [SRC]
+sys.modules["cadet"] = cadet
+
+# cadet.Configuration is provided on the device, the tests read the settings from
+# src/etc/config.yml
+with open(os.path.join(SRC, "etc", "config.yml"), "r") as f:
+    settings = yaml.safe_load(f)
+Configuration = types.ModuleType("cadet.Configuration")
+Configuration.Config = type("Config", (object,), settings)
+sys.modules["cadet.Configuration"] = Configuration
+cadet.Configuration = Configuration
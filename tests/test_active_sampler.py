@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from cadet.config_space import ConfigSpace
+from cadet.active_sampler import ActiveSampler
+
+COLUMNS = ["core_freq", "journal_mode"]
+
+def make_sampler(**kwargs):
+    space = ConfigSpace([range(10), ("wal", "delete", "memory")])
+    return ActiveSampler(space, COLUMNS, ["inference_time"], seed=0, **kwargs)
+
+def measure(configs):
+    rows = [{"core_freq": c, "journal_mode": m,
+             "inference_time": 10.0 - c + (5.0 if m == "memory" else 0.0)}
+            for c, m in configs]
+    return pd.DataFrame(rows)
+
+def test_categorical_columns_are_encoded():
+    sampler = make_sampler()
+    assert sampler.encoders[0] is None
+    assert sampler.encoders[1] == {"delete": 0, "memory": 1, "wal": 2}
+    X = sampler.get_features([(3, "wal"), (4, "sync")])
+    assert X.tolist() == [[3.0, 2.0], [4.0, -1.0]]
+
+def test_batches_skip_measured_configurations():
+    pytest.importorskip("sklearn")
+    sampler = make_sampler(initial_size=10, batch_size=5, n_estimators=10)
+    measured = set(sampler.next_batch(set()))
+    assert len(measured) == 10
+    df = measure(measured)
+    sampler.update(df, df)
+    batch = sampler.next_batch(measured)
+    assert len(batch) == 5 and not set(batch) & measured
+    new = measure(batch)
+    sampler.update(pd.concat([df, new]), new)
+    assert len(sampler.errors) == 1 and np.isfinite(sampler.errors[0])
+
+def test_done_when_the_error_plateaus():
+    sampler = make_sampler(patience=2, tol=0.1, max_samples=100)
+    sampler.errors = [1.0, 0.5, 0.48, 0.47]
+    assert sampler.done(10)
+    sampler.errors = [1.0, 0.8, 0.5, 0.2]
+    assert not sampler.done(10)
+    assert sampler.done(100)
@@ -0,0 +1,30 @@
+import itertools
+
+from cadet.config_params import order_configs
+
+COLUMNS = ["core_freq", "gpu_freq", "vm.swappiness"]
+
+def changes(params, order, weights=None):
+    cost = 0.0
+    for i, j in zip(order, order[1:]):
+        for col, a, b in zip(COLUMNS, params[i], params[j]):
+            if a != b:
+                cost += (weights or {}).get(col, 1.0)
+    return cost
+
+def test_order_is_a_permutation():
+    params = list(itertools.product((1, 2), (10, 20), (30, 60)))
+    order = order_configs(params, COLUMNS)
+    assert sorted(order) == list(range(len(params)))
+    # a gray code tour changes one knob at a time
+    assert changes(params, order) == len(params) - 1
+    assert order_configs([], COLUMNS) == []
+
+def test_expensive_knobs_change_least():
+    params = list(itertools.product((1, 2, 3), (10, 20, 30)))
+    weights = {"core_freq": 10.0}
+    order = order_configs(params, COLUMNS, weights)
+    core = [params[i][0] for i in order]
+    # the core frequency is changed twice, once per value
+    assert sum(a != b for a, b in zip(core, core[1:])) == 2
+    assert changes(params, order, weights) < changes(params, list(range(9)), weights)
@@ -0,0 +1,48 @@
+import itertools
+import pytest
+
+from cadet.config_space import ConfigSpace
+
+STATUS = [("1", "0"), ("1", "1")]
+OPTIONS = [STATUS, (100, 200, 300), ("wal", "delete")]
+
+def test_decode_matches_the_product():
+    space = ConfigSpace(OPTIONS)
+    assert space.size == 12
+    product = [a + (b, c) for a, b, c in itertools.product(*OPTIONS)]
+    assert [space.decode(i) for i in range(space.size)] == product
+
+def test_encode_inverts_get_digits():
+    space = ConfigSpace(OPTIONS)
+    for index in range(space.size):
+        assert space.encode(space.get_digits(index)) == index
+    with pytest.raises(IndexError):
+        space.decode(space.size)
+
+def test_large_space_is_not_enumerated():
+    space = ConfigSpace([range(1000)] * 8)
+    assert space.size == 1000 ** 8
+    index = space.size - 1
+    assert space.decode(index) == (999,) * 8
+    configs = list(space.uniform(100, seed=0))
+    assert len(set(configs)) == 100
+
+@pytest.mark.parametrize("method", ["uniform", "lhs"])
+def test_stream_gives_distinct_configurations(method):
+    space = ConfigSpace(OPTIONS)
+    configs = list(space.stream(12, method=method, seed=0, max_rounds=50))
+    assert len(configs) == len(set(configs))
+    assert set(configs) <= set(space.decode(i) for i in range(space.size))
+    # the small space is covered
+    assert len(configs) >= 10
+
+def test_lhs_uses_every_value():
+    import numpy as np
+    space = ConfigSpace([range(4), range(4)])
+    digits = space.lhs_digits(8, np.random.default_rng(0))
+    for j in range(2):
+        assert sorted(digits[:, j]) == [0, 0, 1, 1, 2, 2, 3, 3]
+
+def test_get_domains_splits_tuple_options():
+    domains = ConfigSpace(OPTIONS).get_domains()
+    assert domains == [["1"], ["0", "1"], [100, 200, 300], ["delete", "wal"]]
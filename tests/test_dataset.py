@@ -0,0 +1,40 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+from cadet.dataset import Dataset
+from tests.conftest import ROOT
+
+def write_csv(path, df):
+    df.to_csv(str(path), index=False)
+
+def test_same_values_as_read_csv(tmp_path):
+    dataset = Dataset(os.path.join(ROOT, "Data"), str(tmp_path))
+    path = dataset.get_path("Initial", "Single", "TX2", "Image")
+    columns = ["core_freq", "inference_time", "total_energy_consumption"]
+    df = dataset.load("Initial", "Single", "TX2", "Image", columns)
+    pd.testing.assert_frame_equal(df, pd.read_csv(path)[columns].astype(np.float64))
+    # the second load reads the cache
+    assert os.path.exists(os.path.join(str(tmp_path), "Initial", "Single", "TX2",
+                                       "Image", "meta.json"))
+    pd.testing.assert_frame_equal(df, dataset.load("Initial", "Single", "TX2",
+                                                   "Image", columns))
+
+def test_changed_csv_is_rebuilt(tmp_path):
+    path = tmp_path / "data.csv"
+    write_csv(path, pd.DataFrame({"a": [1, 2], "b": [3, 4]}))
+    dataset = Dataset(str(tmp_path), str(tmp_path / "cache"), validate="hash")
+    assert dataset.read_csv(str(path))["a"].tolist() == [1.0, 2.0]
+    write_csv(path, pd.DataFrame({"a": [5, 6], "b": [7, 8]}))
+    assert dataset.read_csv(str(path))["a"].tolist() == [5.0, 6.0]
+
+def test_non_numeric_values_and_missing_columns(tmp_path):
+    path = tmp_path / "data.csv"
+    write_csv(path, pd.DataFrame({"a": [1, "x"]}))
+    dataset = Dataset(str(tmp_path), str(tmp_path / "cache"))
+    assert np.isnan(dataset.read_csv(str(path))["a"][1])
+    with pytest.raises(KeyError):
+        dataset.read_csv(str(path), ["b"])
+    with pytest.raises(ValueError):
+        Dataset(validate="size")
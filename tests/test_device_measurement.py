@@ -0,0 +1,78 @@
+import time
+import numpy as np
+import pandas as pd
+
+from cadet.sampler import SysfsSampler
+from cadet.measurement_daemon import MeasurementDaemon
+from cadet.device_measurement import DeviceMeasurement
+from cadet.debugger import Debugger
+
+DURATION = 0.5
+
+class FakeClient(object):
+    """inference client whose requests take DURATION seconds"""
+    def warm_up(self, num_requests=1, payload=None):
+        pass
+
+    def run(self, num_requests=1, payload=None):
+        time.sleep(DURATION)
+        latencies = np.full(num_requests, DURATION)
+        return {"latencies": latencies, "server_times": latencies,
+                "throughputs": np.full(num_requests, 10.0),
+                "p50": DURATION, "p95": DURATION, "p99": DURATION}
+
+    def close(self):
+        pass
+
+class FakeApplier(object):
+    columns = ["core_freq"]
+
+    def __init__(self):
+        self.applied = []
+
+    def apply(self, cur_config):
+        self.applied.append(cur_config)
+        return {}
+
+class FakeSettle(object):
+    def wait(self):
+        return 0.0, True
+
+    def close(self):
+        pass
+
+def make_device(tmp_path, power):
+    (tmp_path / "power").write_text("{0}\n".format(power))
+    sampler = SysfsSampler({"total_power": "power"}, rate=50, root=str(tmp_path))
+    daemon = MeasurementDaemon("TX2", None, events=None, sampler=sampler,
+                               client=FakeClient())
+    return DeviceMeasurement(FakeApplier(), FakeSettle(), daemon)
+
+def make_debugger(query):
+    columns = ["core_freq", "total_energy_consumption"]
+    df = pd.DataFrame([[1.0, 1000.0]], columns=columns)
+    return Debugger(None, df, columns, [], ["total_energy_consumption"],
+                    {"core_freq": [1.0]}, query, 1)
+
+def test_energy_is_on_the_data_scale(tmp_path):
+    device = make_device(tmp_path, 1000)
+    measured = device([{"core_freq": 1.0}])[0]
+    device.close()
+    # the sum of 0.5 s samples of 1000 mW over 0.5 s, the integral is 500 mJ
+    assert abs(measured["total_energy_consumption"] - 1000) < 250
+    assert abs(measured["total_energy_mj"] - 500) < 125
+    assert device.applier.applied == [[1]]
+
+def test_is_fixed_compares_the_same_scale(tmp_path):
+    # a bug measured at 1000 mW for 0.5 s in Data/
+    bug_val = {"total_energy_consumption": 1000.0}
+    debugger = make_debugger(0.3)
+    device = make_device(tmp_path, 1000)
+    same = device([{"core_freq": 1.0}])[0]
+    device.close()
+    # the same power is not a fix, on the mJ scale it would look like one
+    assert not debugger.is_fixed(bug_val, same)
+    device = make_device(tmp_path, 400)
+    lower = device([{"core_freq": 1.0}])[0]
+    device.close()
+    assert debugger.is_fixed(bug_val, lower)
@@ -0,0 +1,121 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+from cadet.fci import FCI, fisher_z, NULL, CIRCLE, ARROW, TAIL
+from cadet.matrix import COLUMNS, CONF_OPT, OBJECTIVES
+from tests.conftest import ROOT
+
+DATA = os.path.join(ROOT, "Data", "Initial", "Single", "TX2", "Image", "data.csv")
+
+def make_data(n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    a = rng.normal(size=n)
+    b = rng.normal(size=n)
+    c = a + b + rng.normal(size=n)
+    d = c + rng.normal(size=n)
+    return pd.DataFrame({"a": a, "b": b, "c": c, "d": d})
+
+def get_tabu_edges(columns):
+    # the constraints of CausalModel.get_tabu_edges
+    tabu_edges = [(col, opt) for opt in CONF_OPT for col in columns if col != opt]
+    tabu_edges += [(obj, col) for obj in OBJECTIVES for col in columns if col != obj]
+    return tabu_edges
+
+def make_marks(nodes, edges):
+    """edges are (u, mark at u, mark at v, v)"""
+    index = {v: i for i, v in enumerate(nodes)}
+    mark = np.full((len(nodes), len(nodes)), NULL, dtype=np.int8)
+    for u, at_u, at_v, v in edges:
+        mark[index[v], index[u]] = at_u
+        mark[index[u], index[v]] = at_v
+    return mark, index
+
+def test_fisher_z_matches_the_partial_correlation():
+    df = make_data()
+    X = df.to_numpy()
+    corr = np.corrcoef(X, rowvar=False)
+    # a and d given c, from the residuals of the regressions on c
+    Z = np.column_stack([np.ones(len(X)), X[:, 2]])
+    res_a = X[:, 0] - Z @ np.linalg.lstsq(Z, X[:, 0], rcond=None)[0]
+    res_d = X[:, 3] - Z @ np.linalg.lstsq(Z, X[:, 3], rcond=None)[0]
+    r = np.corrcoef(res_a, res_d)[0, 1]
+    z = np.arctanh(r) * np.sqrt(len(X) - 1 - 3)
+    pval = fisher_z(corr, len(X), [[0, 3, 2], [0, 1, 2]])
+    assert np.isclose(pval[0], 2 * stats.norm.sf(abs(z)))
+    # a and b are dependent given their common effect c
+    assert pval[1] < 1e-6
+
+def test_collider_and_rule_1():
+    edges = FCI().fit(make_data())
+    assert sorted(edges) == ["a o-> c", "b o-> c", "c --> d"]
+
+def test_chain_is_not_oriented():
+    edges = FCI().fit(make_data()[["a", "c", "d"]])
+    assert sorted(edges) == ["a o-o c", "c o-o d"]
+
+def test_tabu_edges():
+    df = make_data()[["a", "c", "d"]]
+    assert FCI().fit(df, [("a", "c"), ("c", "a")]) == ["c o-o d"]
+    # a forbidden c --> a puts an arrowhead at c, R1 then orients c --> d
+    assert sorted(FCI().fit(df, [("c", "a")])) == ["a o-> c", "c --> d"]
+
+def test_rule_2():
+    # a --> b o-> c and a o-o c => a o-> c
+    mark, i = make_marks("abc", [("a", TAIL, ARROW, "b"), ("b", CIRCLE, ARROW, "c"),
+                                 ("a", CIRCLE, CIRCLE, "c")])
+    assert FCI().rule_2(mark)
+    assert mark[i["a"], i["c"]] == ARROW and mark[i["c"], i["a"]] == CIRCLE
+
+def test_rule_3():
+    # a o-> b <-o c, a o-o d o-o c, d o-o b => d o-> b
+    mark, i = make_marks("abcd", [("a", CIRCLE, ARROW, "b"), ("c", CIRCLE, ARROW, "b"),
+                                  ("a", CIRCLE, CIRCLE, "d"), ("c", CIRCLE, CIRCLE, "d"),
+                                  ("d", CIRCLE, CIRCLE, "b")])
+    assert FCI().rule_3(mark)
+    assert mark[i["d"], i["b"]] == ARROW and mark[i["b"], i["d"]] == CIRCLE
+
+@pytest.mark.parametrize("in_sepset", [True, False])
+def test_rule_4(in_sepset):
+    # discriminating path <e, a, b, c>: e --> a <-o b, a --> c and b o-o c
+    nodes = "abce"
+    mark, i = make_marks(nodes, [("e", TAIL, ARROW, "a"), ("b", CIRCLE, ARROW, "a"),
+                                 ("a", TAIL, ARROW, "c"), ("b", CIRCLE, CIRCLE, "c")])
+    fci = FCI()
+    fci.sepset = {(i["e"], i["c"]): {i["b"]} if in_sepset else set()}
+    assert fci.rule_4(mark)
+    if in_sepset:
+        # b --> c
+        assert (mark[i["c"], i["b"]], mark[i["b"], i["c"]]) == (TAIL, ARROW)
+    else:
+        # a <-> b <-> c
+        assert mark[i["a"], i["b"]] == mark[i["b"], i["a"]] == ARROW
+        assert mark[i["b"], i["c"]] == mark[i["c"], i["b"]] == ARROW
+
+def test_parallel_tests_give_the_same_graph():
+    df = pd.read_csv(DATA)[COLUMNS]
+    tabu_edges = get_tabu_edges(COLUMNS)
+    serial = FCI().fit(df, tabu_edges)
+    parallel = FCI(n_jobs=2, min_parallel_tests=0).fit(df, tabu_edges)
+    assert serial == parallel
+    # a forbidden u --> v leaves an arrowhead at u, nothing causes an option and
+    # an objective causes nothing
+    for edge in serial:
+        u, arrow, v = edge.split(" ")
+        heads = {u: arrow.startswith("<"), v: arrow.endswith(">")}
+        for node, other in ((u, v), (v, u)):
+            if node in CONF_OPT:
+                assert heads[other]
+            if node in OBJECTIVES:
+                assert heads[node]
+
+def test_same_graph_as_tetrad():
+    pytest.importorskip("pycausal")
+    from cadet.fci_engine import FCIEngine
+    df = pd.read_csv(DATA)[COLUMNS]
+    tabu_edges = get_tabu_edges(COLUMNS)
+    native = FCI().fit(df, tabu_edges)
+    tetrad = FCIEngine.get_instance().run(df, tabu_edges)
+    assert sorted(native) == sorted(tetrad)
@@ -0,0 +1,27 @@
+import threading
+import numpy as np
+
+from cadet.histogram import Histogram
+
+def test_concurrent_observations_are_all_counted():
+    hist = Histogram("latency", np.logspace(-3, 3, 25))
+    def observe():
+        for i in range(2000):
+            hist.observe(0.01 * (i % 7 + 1))
+    threads = [threading.Thread(target=observe) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert hist.counts.sum() == 16000
+    assert np.isclose(hist.total, 8 * sum(0.01 * (i % 7 + 1) for i in range(2000)))
+
+def test_prometheus_buckets_are_cumulative():
+    hist = Histogram("latency", [0.1, 1.0])
+    for value in (0.05, 0.5, 0.5, 5.0):
+        hist.observe(value)
+    lines = hist.to_prometheus().splitlines()
+    assert 'latency_bucket{le="0.1"} 1' in lines
+    assert 'latency_bucket{le="1"} 3' in lines
+    assert 'latency_bucket{le="+Inf"} 4' in lines
+    assert "latency_count 4" in lines
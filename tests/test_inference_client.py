@@ -0,0 +1,35 @@
+import threading
+import pytest
+
+pytest.importorskip("flask")
+from werkzeug.serving import make_server, WSGIRequestHandler
+
+from cadet.set_workload import SetWorkload
+from cadet.inference_client import InferenceClient
+
+@pytest.fixture
+def unix_server(tmp_path):
+    socket_path = str(tmp_path / "workload.sock")
+    swl = SetWorkload({"software_system": "SQLite", "properties": {}}, serve=False)
+    swl.host = SetWorkload.get_host(socket_path)
+    WSGIRequestHandler.protocol_version = "HTTP/1.1"
+    server = make_server(swl.host, 0, swl.app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield socket_path
+    server.shutdown()
+
+def test_client_over_unix_socket(unix_server):
+    payload = {"num_samples": 200, "batch_size": 50,
+               "options": {"synchronous": "OFF"}}
+    with InferenceClient("http://localhost/api", socket_path=unix_server) as client:
+        client.warm_up(1, payload)
+        result = client.run(3, payload)
+    assert len(result["latencies"]) == 3
+    assert (result["server_times"] > 0).all()
+    assert (result["throughputs"] > 0).all()
+    assert result["p50"] <= result["p99"]
+
+def test_host_of_the_server():
+    assert SetWorkload.get_host(None) == "127.0.0.1"
+    assert SetWorkload.get_host("/tmp/w.sock") == "unix:///tmp/w.sock"
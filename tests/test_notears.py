@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from cadet.notears import IncrementalNotears
+
+COLUMNS = ["a", "b", "c", "d", "e"]
+THRES = 0.3
+
+def make_data(n=600, seed=0):
+    """linear SEM a -> b -> c, a -> d -> e"""
+    rng = np.random.default_rng(seed)
+    a = rng.normal(size=n)
+    b = 1.5 * a + rng.normal(size=n)
+    c = -1.2 * b + rng.normal(size=n)
+    d = 1.0 * a + rng.normal(size=n)
+    e = 1.4 * d + rng.normal(size=n)
+    return np.column_stack([a, b, c, d, e])
+
+def test_covariance_matches_numpy():
+    X = make_data(200)
+    nt = IncrementalNotears(COLUMNS, standardize=False)
+    for start in range(0, 200, 37):
+        nt.partial_fit(X[start:start + 37])
+    assert nt.n == 200
+    assert np.allclose(nt.mean, X.mean(axis=0))
+    assert np.allclose(nt.covariance(), np.cov(X, rowvar=False, bias=True))
+
+def test_tabu_edges_are_never_learned():
+    X = make_data(300)
+    nt = IncrementalNotears(COLUMNS, tabu_edges=[("a", "b"), ("b", "a")])
+    nt.partial_fit(X)
+    nt.fit(warm_start=False)
+    assert nt.W[0, 1] == 0 and nt.W[1, 0] == 0
+    assert np.all(np.diag(nt.W) == 0)
+
+def test_incremental_and_full_fit_learn_the_same_edges():
+    X = make_data()
+    full = IncrementalNotears(COLUMNS)
+    full.partial_fit(X)
+    full.fit(warm_start=False)
+    incremental = IncrementalNotears(COLUMNS)
+    incremental.partial_fit(X[:300])
+    incremental.fit(warm_start=False)
+    for start in (300, 450):
+        incremental.update(X[start:start + 150], THRES)
+    assert incremental.n == full.n
+    assert set(incremental.get_edges(THRES)) == set(full.get_edges(THRES))
+    # the skeleton of the generating model
+    skeleton = set(frozenset(edge) for edge in full.get_edges(THRES))
+    assert skeleton == {frozenset(e) for e in [("a", "b"), ("b", "c"), ("a", "d"),
+                                               ("d", "e")]}
+
+def test_update_refits_near_the_threshold():
+    X = make_data()
+    nt = IncrementalNotears(COLUMNS)
+    nt.partial_fit(X[:300])
+    nt.fit(warm_start=False)
+    # every weight is within a huge tolerance of the threshold
+    assert nt.update(X[300:], THRES, refit_tol=10.0)
+    refit = nt.W.copy()
+    cold = IncrementalNotears(COLUMNS)
+    cold.partial_fit(X)
+    assert np.allclose(refit, cold.fit(warm_start=False))
+
+def test_cache_key_depends_on_the_update_history():
+    pytest.importorskip("causalnex")
+    from cadet.causal_model import CausalModel
+    df = pd.DataFrame(make_data(), columns=COLUMNS)
+    CM = CausalModel()
+    first = CM.get_notears_history(df, [])
+    CM.learn_notears(df.iloc[:300], [], THRES, incremental=True)
+    CM.learn_notears(df.iloc[:450], [], THRES, incremental=True)
+    assert first == (600, 0)
+    assert CM.get_notears_history(df, []) == (300, 2)
+    _, edges = CM.learn_notears(df, [], THRES, incremental=True)
+    full = IncrementalNotears(COLUMNS)
+    full.partial_fit(df.to_numpy())
+    full.fit(warm_start=False)
+    assert set(edges) == set(full.get_edges(THRES))
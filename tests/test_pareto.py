@@ -0,0 +1,51 @@
+import itertools
+import numpy as np
+
+from cadet.pareto import dominates, pareto_front, pareto_rank, crowding_distance
+
+# three fronts of two objectives, both minimized
+FRONT_0 = [[1, 5], [2, 3], [4, 1]]
+FRONT_1 = [[2, 6], [3, 4], [5, 2]]
+FRONT_2 = [[6, 6]]
+
+def brute_force_front(Y):
+    Y = np.asarray(Y, dtype=np.float64)
+    return np.array([not np.any(dominates(Y, y)) for y in Y])
+
+def test_rank_of_known_fronts():
+    Y = FRONT_1 + FRONT_2 + FRONT_0
+    rank = pareto_rank(Y)
+    assert rank.tolist() == [1, 1, 1, 2, 0, 0, 0]
+    assert pareto_front(Y).tolist() == [False] * 4 + [True] * 3
+
+def test_front_against_brute_force():
+    rng = np.random.default_rng(0)
+    for _ in range(20):
+        # integer values give ties and duplicate points
+        Y = rng.integers(0, 5, size=(30, 3))
+        assert pareto_front(Y).tolist() == brute_force_front(Y).tolist()
+
+def test_duplicates_share_the_front():
+    Y = [[1, 2], [1, 2], [2, 1], [3, 3]]
+    assert pareto_rank(Y).tolist() == [0, 0, 0, 1]
+
+def test_rank_fronts_do_not_dominate_each_other():
+    rng = np.random.default_rng(1)
+    Y = rng.random((50, 2))
+    rank = pareto_rank(Y)
+    for i, j in itertools.combinations(range(len(Y)), 2):
+        if rank[i] == rank[j]:
+            assert not dominates(Y[[i]], Y[j])[0]
+        elif rank[i] < rank[j]:
+            assert not dominates(Y[[j]], Y[i])[0]
+
+def test_crowding_distance():
+    dist = crowding_distance(FRONT_0 + [[3, 2]])
+    # extremes of every objective are kept first
+    assert np.isinf(dist[0]) and np.isinf(dist[2])
+    # (2, 3) spans (1..3)/3 and (2..5)/4, (3, 2) spans (2..4)/3 and (1..3)/4
+    assert np.isclose(dist[1], 2 / 3 + 3 / 4)
+    assert np.isclose(dist[3], 2 / 3 + 2 / 4)
+
+def test_crowding_distance_small_fronts():
+    assert np.isinf(crowding_distance([[1, 2], [2, 1]])).all()
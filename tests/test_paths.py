@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("causalnex")
+from cadet.causal_model import Graph
+
+def make_graph(num_nodes=8, p=0.4, seed=0):
+    rng = np.random.default_rng(seed)
+    nodes = ["n{0}".format(i) for i in range(num_nodes)]
+    g = Graph(nodes)
+    edges = {}
+    for u in nodes:
+        for v in nodes:
+            if u != v and rng.random() < p:
+                # distinct weights, the order of the paths has no ties
+                edges[(u, v)] = rng.uniform(0.1, 1.0) * rng.choice([-1, 1])
+                g.add_edge(u, v, edges[(u, v)])
+    return g, edges
+
+def brute_force_paths(edges, s, max_length=None):
+    """maximal simple paths from s with the product of the normalized weights"""
+    scale = max(abs(w) for w in edges.values())
+    out = {}
+    for u, v in edges:
+        out.setdefault(u, []).append(v)
+    paths = []
+    def visit(path, score):
+        nxt = out.get(path[-1], [])
+        if not nxt or (max_length is not None and len(path) > max_length):
+            paths.append((score, path))
+            return
+        for v in nxt:
+            if v not in path:
+                visit(path + [v], score * abs(edges[(path[-1], v)]) / scale)
+    visit([s], 1.0)
+    return paths
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("max_length", [None, 3])
+def test_top_k_paths_against_brute_force(seed, max_length):
+    g, edges = make_graph(seed=seed)
+    expected = brute_force_paths(edges, "n0", max_length)
+    for k in (1, 5, len(expected) + 1):
+        best = sorted(expected, key=lambda p: -p[0])[:k]
+        assert g.top_k_paths("n0", k, max_length) == [path for _, path in best]
+
+@pytest.mark.parametrize("max_length", [None, 2])
+def test_iter_paths_against_brute_force(max_length):
+    g, edges = make_graph(seed=7)
+    expected = sorted(path for _, path in brute_force_paths(edges, "n0", max_length))
+    assert sorted(g.get_all_paths("n0", max_length)) == expected
+
+def test_graph_changes_rebuild_the_csr():
+    g = Graph(["a", "b", "c"])
+    g.add_edge("a", "b", 1.0)
+    assert g.top_k_paths("a", 5) == [["a", "b"]]
+    g.add_edge("b", "c", 0.5)
+    g.add_edge("a", "c", 0.1)
+    assert g.top_k_paths("a", 5) == [["a", "b", "c"], ["a", "c"]]
@@ -0,0 +1,62 @@
+import numpy as np
+
+from cadet.perf import Perf
+
+STAT = """# started on Sun Oct 18 18:38:05 2026
+
+1523004,,cycles:u,1001234,100.00,,
+<not counted>,,cache-misses,0,0.00,,
+<not supported>,,branch-load-misses,0,100.00,,
+12,,cpu-migrations,1001234,100.00,,
+7,,cs,1001234,100.00,,
+300,,cpu_core/instructions/,1001234,100.00,,
+5,,sched:sched_switch,1001234,100.00,,
+9,,sched:sched_switch,1001234,100.00,,
+"""
+
+INTERVALS = """#           time             counts unit events
+     0.500,100,,cycles,500000,100.00,,
+     0.500,3,,context-switches,500000,100.00,,
+     1.000,150,,cycles,500000,100.00,,
+     1.000,<not counted>,,context-switches,0,0.00,,
+"""
+
+def test_parse_perf_csv(tmp_path):
+    path = tmp_path / "cur"
+    path.write_text(STAT)
+    df = Perf().parse_perf_csv(str(path))
+    assert len(df) == 1
+    row = df.iloc[0]
+    assert row["cycles"] == 1523004
+    assert row["migrations"] == 12
+    assert row["context-switches"] == 7
+    assert row["instructions"] == 300
+    assert np.isnan(row["cache-misses"]) and np.isnan(row["branch-load-misses"])
+    # the first count of a repeated tracepoint is kept
+    assert row["sched:sched_switch"] == 5
+
+def test_parse_perf_intervals(tmp_path):
+    path = tmp_path / "cur"
+    path.write_text(INTERVALS)
+    df = Perf().parse_perf_intervals(str(path))
+    assert df.index.tolist() == [0.5, 1.0]
+    assert df["cycles"].tolist() == [100, 150]
+    assert df.loc[0.5, "context-switches"] == 3
+    assert np.isnan(df.loc[1.0, "context-switches"])
+
+def test_empty_intervals(tmp_path):
+    path = tmp_path / "cur"
+    path.write_text("# no counts\n")
+    assert Perf().parse_perf_intervals(str(path)).empty
+
+def test_normalize_event():
+    perf = Perf()
+    assert perf.normalize_event("cycles:ukh") == "cycles"
+    assert perf.normalize_event("cpu_atom/cache-misses/") == "cache-misses"
+    assert perf.normalize_event("raw_syscalls:sys_enter") == "raw_syscalls:sys_enter"
+
+def test_stat_command():
+    cmd = Perf.stat_command("cycles", pid=42, interval_ms=500)
+    assert cmd == ["perf", "stat", "-x", ",", "-e", "cycles", "-o", "cur",
+                   "-p", "42", "-I", "500"]
+    assert "-a" in Perf.stat_command("cycles")
@@ -0,0 +1,44 @@
+import numpy as np
+
+from cadet.repetitions import AdaptiveRepetition
+
+def run(rep, values):
+    rep.reset()
+    for value in values:
+        if rep.done():
+            break
+        rep.update({"inference_time": value})
+    return rep.count
+
+def test_stable_configuration_stops_at_the_minimum():
+    rep = AdaptiveRepetition(["inference_time"], min_repetitions=3)
+    assert run(rep, [1.0] * 10) == 3
+    stats = rep.get_stats()
+    assert stats["converged"] and stats["inference_time_mean"] == 1.0
+    assert stats["inference_time_ci"] == 0.0
+
+def test_noisy_configuration_stops_at_the_maximum():
+    rep = AdaptiveRepetition(["inference_time"], max_repetitions=6)
+    assert run(rep, [1.0, 3.0] * 10) == 6
+    assert not rep.get_stats()["converged"]
+
+def test_interval_matches_the_t_interval():
+    rep = AdaptiveRepetition(["inference_time"], confidence=0.95)
+    x = [1.0, 1.2, 0.9, 1.1]
+    for value in x:
+        rep.update({"inference_time": value})
+    mean, half_width, rel_width = rep.interval("inference_time")
+    # t(0.975, 3) = 3.182
+    expected = 3.182446 * np.std(x, ddof=1) / np.sqrt(len(x))
+    assert np.isclose(mean, np.mean(x))
+    assert np.isclose(half_width, expected, rtol=1e-5)
+    assert np.isclose(rel_width, 2 * expected / np.mean(x), rtol=1e-5)
+
+def test_every_objective_must_be_stable():
+    rep = AdaptiveRepetition(["inference_time", "total_energy_consumption"],
+                             max_repetitions=5)
+    rep.reset()
+    while not rep.done():
+        energy = 1000.0 if rep.count % 2 else 3000.0
+        rep.update({"inference_time": 1.0, "total_energy_consumption": energy})
+    assert rep.count == 5
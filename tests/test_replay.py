@@ -0,0 +1,35 @@
+import os
+import numpy as np
+import pandas as pd
+
+from cadet.dataset import Dataset
+from cadet.replay import ReplayMeasurement
+from cadet.matrix import COLUMNS, CONF_OPT
+from tests.conftest import ROOT
+
+def make_replay():
+    df = pd.DataFrame({"core_freq": [1.0, 1.0, 2.0, 4.0],
+                       "gpu_freq": [10.0, 10.0, 10.0, 20.0],
+                       "inference_time": [1.0, 3.0, 5.0, 7.0]})
+    return ReplayMeasurement(df, ["core_freq", "gpu_freq"])
+
+def test_exact_match_averages_repetitions():
+    measured = make_replay()([{"core_freq": 1.0, "gpu_freq": 10.0}])[0]
+    assert measured["match"] == "exact" and measured["distance"] == 0.0
+    assert measured["inference_time"] == 2.0
+
+def test_unrecorded_configuration_gets_the_nearest_neighbour():
+    measured = make_replay().lookup({"core_freq": 3.9, "gpu_freq": 20.0})
+    assert measured["match"] == "nearest"
+    assert measured["inference_time"] == 7.0
+    assert np.isclose(measured["distance"], 0.1 / 3)
+
+def test_ground_truth_rows_answer_themselves(tmp_path):
+    dataset = Dataset(os.path.join(ROOT, "Data"), str(tmp_path))
+    replay = ReplayMeasurement.from_dataset(dataset, "Single", "TX2", "Image",
+                                            COLUMNS, CONF_OPT)
+    row = replay.df.iloc[0]
+    measured = replay.lookup(row.to_dict())
+    assert measured["match"] == "exact"
+    same = replay.df[(replay.df[CONF_OPT] == row[CONF_OPT]).all(axis=1)]
+    assert np.isclose(measured["inference_time"], same["inference_time"].mean())
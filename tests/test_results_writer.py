@@ -0,0 +1,50 @@
+import os
+import signal
+import multiprocessing
+
+from cadet.results_writer import ResultsWriter
+
+def interrupted_run(path):
+    writer = ResultsWriter(path, batch_size=2)
+    for config_id in (0, 1):
+        for i in range(2):
+            writer.append(config_id, {"run": "first", "iteration": i})
+        writer.commit(config_id)
+    # killed while the rows of config 2 are written, before its checkpoint
+    for i in range(3):
+        writer.append(2, {"run": "first", "iteration": i})
+    writer.fh.write("\n".join(writer.buffer)[:-5])
+    writer.fh.flush()
+    os.kill(os.getpid(), signal.SIGKILL)
+
+def test_resume_after_kill_mid_batch(tmp_path):
+    path = str(tmp_path / "log.jsonl")
+    proc = multiprocessing.get_context("fork").Process(target=interrupted_run,
+                                                       args=(path,))
+    proc.start()
+    proc.join()
+    assert proc.exitcode == -signal.SIGKILL
+    writer = ResultsWriter(path)
+    assert writer.completed() == {0, 1}
+    for i in range(2):
+        writer.append(2, {"run": "second", "iteration": i})
+    writer.commit(2)
+    writer.close()
+    df = writer.to_dataframe()
+    assert len(df) == 6
+    rows = df[df["config_id"] == 2]
+    assert len(rows) == 2
+    assert set(rows["run"]) == {"second"}
+    # every line of the log is a complete record
+    with open(path, "r") as f:
+        assert all(line.endswith("\n") for line in f)
+
+def test_reopen_keeps_committed_log(tmp_path):
+    path = str(tmp_path / "log.jsonl")
+    with ResultsWriter(path) as writer:
+        writer.append("a", {"x": 1})
+        writer.commit("a")
+    size = os.path.getsize(path)
+    ResultsWriter(path).close()
+    assert os.path.getsize(path) == size
+    assert ResultsWriter(path).completed() == {"a"}
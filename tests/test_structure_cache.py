@@ -0,0 +1,44 @@
+import json
+import pandas as pd
+
+from cadet.structure_cache import StructureCache
+
+def make_key(cache, df, **params):
+    return cache.make_key(df, ["a", "b"], [("b", "a")], 0.75, **params)
+
+def test_round_trip_across_instances(tmp_path):
+    df = pd.DataFrame({"a": [1.0, 2.0], "b": [3.0, 4.0]})
+    cache = StructureCache(str(tmp_path))
+    key = make_key(cache, df)
+    assert cache.get(key) is None
+    cache.put(key, [("a", "b")], [])
+    assert StructureCache(str(tmp_path)).get(key) == ([("a", "b")], [])
+
+def test_key_depends_on_data_and_params(tmp_path):
+    cache = StructureCache(str(tmp_path))
+    df = pd.DataFrame({"a": [1.0, 2.0], "b": [3.0, 4.0]})
+    key = make_key(cache, df)
+    assert key == make_key(cache, df.copy())
+    assert key != make_key(cache, df.assign(b=[3.0, 5.0]))
+    assert key != make_key(cache, df, fci_backend="native")
+    assert key != cache.make_key(df, ["a", "b"], [], 0.75)
+
+def test_least_recently_used_is_evicted(tmp_path):
+    cache = StructureCache(str(tmp_path), max_entries=2)
+    cache.put("k1", [("a", "b")], [])
+    cache.put("k2", [("b", "a")], [])
+    # k1 is used after k2 was stored
+    cache.index["k2"] -= 10
+    assert cache.get("k1") is not None
+    cache.put("k3", [], [("a", "b")])
+    assert cache.get("k2") is None
+    assert not (tmp_path / "k2.json").exists()
+    assert sorted(cache.index) == ["k1", "k3"]
+
+def test_corrupt_entry_is_a_miss(tmp_path):
+    cache = StructureCache(str(tmp_path))
+    cache.put("k1", [("a", "b")], [])
+    (tmp_path / "k1.json").write_text("{")
+    assert cache.get("k1") is None
+    with open(str(tmp_path / "index.json")) as f:
+        assert "k1" not in json.load(f)
@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+
+from cadet.treatment_effect import TreatmentEffect
+
+class RootGraph(object):
+    """graph in which the options are roots, as under the tabu edges"""
+    def parents(self, nodes):
+        return []
+
+def make_data(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    x = rng.choice([1.0, 2.0, 3.0], n)
+    z = rng.choice([-1.0, 1.0], n)
+    y = x * z + rng.normal(0, 0.1, n)
+    return pd.DataFrame({"x": x, "z": z, "y": y})
+
+def test_effect_depends_on_the_unit():
+    te = TreatmentEffect(make_data(), RootGraph(), "y", ["x", "z"])
+    domains = {"x": [3.0]}
+    up = te.rank(["x"], domains, {"x": 1.0, "z": 1.0})
+    down = te.rank(["x"], domains, {"x": 1.0, "z": -1.0})
+    assert abs(up["effect"][0] - 2.0) < 0.1
+    assert abs(down["effect"][0] + 2.0) < 0.1
+
+def test_population_effect_without_modifiers():
+    te = TreatmentEffect(make_data(), RootGraph(), "y")
+    table = te.rank(["x"], {"x": [3.0]}, {"x": 1.0, "z": 1.0})
+    # the effect averaged over z is close to zero
+    assert abs(table["effect"][0]) < 0.2
+
+def test_missing_unit_values_use_the_mean():
+    te = TreatmentEffect(make_data(), RootGraph(), "y", ["x", "z"])
+    table = te.rank(["x"], {"x": [3.0]}, {"x": 1.0})
+    assert abs(table["effect"][0]) < 0.2
@@ -0,0 +1,63 @@
+import time
+import threading
+
+from cadet.workload import Workload, WORKLOADS, get_workload
+
+class SleepWorkload(Workload):
+    name = "Sleep"
+    options = {"mode": (0, 1, 2)}
+
+    def __init__(self):
+        super().__init__()
+        self.loads = 0
+        self.mixed = []
+
+    def load(self):
+        self.loads += 1
+        time.sleep(0.005)
+
+    def run(self, batch_size=None, num_samples=None):
+        mode = self.config.get("mode")
+        time.sleep(0.002)
+        # the options must not change while the run is in flight
+        if self.config.get("mode") != mode:
+            self.mixed.append(mode)
+        return 1
+
+def test_session_never_reconfigures_a_running_workload():
+    swl = SleepWorkload()
+    seen = []
+    def request(i):
+        options = {"mode": i % 3}
+        with swl.session(options):
+            seen.append((options["mode"], swl.config["mode"]))
+            swl.run()
+    threads = [threading.Thread(target=request, args=(i,)) for i in range(60)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert swl.mixed == []
+    assert len(seen) == 60
+    assert all(asked == applied for asked, applied in seen)
+    assert swl.in_flight == 0 and swl.waiting == 0
+
+def test_session_with_the_applied_options_does_not_reload():
+    swl = SleepWorkload()
+    with swl.session({"mode": 1}):
+        pass
+    with swl.session({"mode": 1, "unknown": 3}):
+        pass
+    assert swl.loads == 1
+
+def test_registry():
+    assert {"Image", "NLP", "Speech", "x264", "SQLite"} <= set(WORKLOADS)
+    assert get_workload("SQLite").unit == "queries"
+
+def test_option_columns_match_the_option_values():
+    for name, cls in WORKLOADS.items():
+        columns = cls.get_option_columns()
+        values = cls.get_option_values()
+        assert len(columns) == len(values)
+    assert WORKLOADS["SQLite"].get_option_columns() == ["journal_mode", "synchronous",
+                                                        "cache_size", "page_size"]